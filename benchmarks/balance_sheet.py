@@ -0,0 +1,70 @@
+"""
+Balance sheet of a ledger, by the row by row add_account_balance (as it was before) and by add_account_balances.
+
+    python benchmarks/balance_sheet.py [rows] [accounts]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from pyluca.account_config import BalanceType
+from pyluca.balances import add_account_balances
+from pyluca.journal import Journal, JournalEntry
+from pyluca.ledger import Ledger
+
+
+def add_account_balance_rows(config: dict, ledger: pd.DataFrame, account: str) -> pd.DataFrame:
+    """
+    add_account_balance as it was before, for comparison
+    """
+    account_type = config['accounts'][account]['type']
+    positive_col, negative_col = 'cr_amount', 'dr_amount'
+    if config['account_types'][account_type]['balance_type'] == BalanceType.DEBIT.value:
+        positive_col, negative_col = 'dr_amount', 'cr_amount'
+
+    balance, balances = 0, []
+    for i, row in ledger.iterrows():
+        if row['account'] == account:
+            balance += row[positive_col]
+            balance -= row[negative_col]
+        balances.append(balance)
+    ledger[account] = balances
+    return ledger
+
+
+def _config(accounts: int) -> dict:
+    return {
+        'account_types': {'ASSET': {'balance_type': 'DEBIT'}, 'INCOME': {'balance_type': 'CREDIT'}},
+        'accounts': {f'ACCOUNT_{i}': {'type': 'ASSET' if i % 2 == 0 else 'INCOME'} for i in range(accounts)},
+        'rules': {}
+    }
+
+
+def main(rows: int, accounts: int):
+    config, start = _config(accounts), datetime(2022, 1, 1)
+    journal = Journal([
+        JournalEntry(
+            i, f'ACCOUNT_{(i * 7) % accounts}', 10.1 * (i % 13) if i % 2 == 0 else 0,
+            0 if i % 2 == 0 else 10.1 * (i % 11), start + timedelta(minutes=i), 'Entry', 'person1', None
+        )
+        for i in range(rows)
+    ])
+    df = Ledger(journal, config).get_df()
+
+    started = time.perf_counter()
+    vectorized = add_account_balances(config, df.copy())
+    print(f'{"add_account_balances":<30} {time.perf_counter() - started:8.3f} s')
+
+    started = time.perf_counter()
+    by_rows = df.copy()
+    for account in config['accounts'].keys():
+        by_rows = add_account_balance_rows(config, by_rows, account)
+    print(f'{"add_account_balance (rows)":<30} {time.perf_counter() - started:8.3f} s')
+    assert (vectorized[list(config['accounts'].keys())] == by_rows[list(config['accounts'].keys())]).all().all()
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    )
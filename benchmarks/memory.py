@@ -0,0 +1,84 @@
+"""
+Memory used per journal line, by the journal entries and by the ledger built over them.
+
+    python benchmarks/memory.py [entries]
+"""
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pyluca.journal import JournalEntry, Journal
+from pyluca.ledger import Ledger
+
+config = {
+    'account_types': {
+        'ASSET': {'balance_type': 'DEBIT'},
+        'INCOME': {'balance_type': 'CREDIT'}
+    },
+    'accounts': {
+        'SAVINGS_BANK': {'type': 'ASSET'},
+        'SALARY': {'type': 'INCOME'}
+    },
+    'rules': {}
+}
+
+
+class DictJournalEntry:
+    """
+    JournalEntry as it was before __slots__, for comparison
+    """
+    def __init__(self, sl_no, account, dr_amount, cr_amount, date, narration, key, event_id):
+        self.sl_no = sl_no
+        self.account = account
+        self.dr_amount = dr_amount
+        self.cr_amount = cr_amount
+        self.date = date
+        self.narration = narration
+        self.key = key
+        self.event_id = event_id
+
+
+def _entries(entry_cls, count: int) -> list:
+    start, narration = datetime(2022, 1, 1), 'Salary'
+    return [
+        entry_cls(
+            i, 'SAVINGS_BANK' if i % 2 == 0 else 'SALARY',
+            100.0 if i % 2 == 0 else 0, 0 if i % 2 == 0 else 100.0,
+            start + timedelta(minutes=i // 2), narration, 'person1', None
+        )
+        for i in range(count)
+    ]
+
+
+def _checked(ledger: Ledger) -> Ledger:
+    ledger.check_trial_balance()
+    return ledger
+
+
+def _measure(build) -> float:
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(count: int):
+    for name, build in [
+        ('journal (dict entries)', lambda: _entries(DictJournalEntry, count)),
+        ('journal (slots entries)', lambda: _entries(JournalEntry, count))
+    ]:
+        print(f'{name:<30} {_measure(build) / count:8.1f} bytes/entry')
+
+    journal = Journal(_entries(JournalEntry, count))
+    for name, build in [
+        ('ledger (LedgerEntry)', lambda: Ledger(journal, config)),
+        ('ledger (compact)', lambda: Ledger(journal, config, compact=True)),
+        # Cumulative dr/cr totals are only built once queried, e.g. by check_trial_balance
+        ('ledger (compact, totals)', lambda: _checked(Ledger(journal, config, compact=True)))
+    ]:
+        print(f'{name:<30} {_measure(build) / count:8.1f} bytes/entry')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
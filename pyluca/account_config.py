@@ -1,6 +1,30 @@
 from enum import Enum
+from typing import Dict, List
 
 
 class BalanceType(Enum):
     CREDIT = 'CREDIT'
     DEBIT = 'DEBIT'
+
+
+class ChartOfAccounts:
+    """
+    The accounts of a config compiled once: name, type and balance type of each account and the accounts of each
+    account type. Raises KeyError for an account of an unknown type.
+
+    :param config: Accounting config
+    """
+    def __init__(self, config: dict):
+        self.type_balance_types: Dict[str, BalanceType] = {
+            account_type: BalanceType[type_config['balance_type']]
+            for account_type, type_config in config['account_types'].items()
+        }
+        self.names: Dict[str, str] = {}
+        self.types: Dict[str, str] = {}
+        self.balance_types: Dict[str, BalanceType] = {}
+        self.type_accounts: Dict[str, List[str]] = {account_type: [] for account_type in self.type_balance_types}
+        for account, account_config in config['accounts'].items():
+            self.names[account] = account_config.get('name', account)
+            self.types[account] = account_config['type']
+            self.balance_types[account] = self.type_balance_types[account_config['type']]
+            self.type_accounts[account_config['type']].append(account)
@@ -1,16 +1,30 @@
 import datetime
 import json
-from typing import Optional
-from pyluca.journal import Journal, JournalEntry
+from typing import Optional, Union, NamedTuple, Iterable, List
+from pyluca.account_config import BalanceType
+from pyluca.amounts import get_minor_units, to_minor
+from pyluca.journal import Journal, JournalEntry, Narration, InvalidEntryException
 from pyluca.ledger import Ledger
 
 
+class Posting(NamedTuple):
+    dr_account: str
+    cr_account: str
+    amount: float
+    date: datetime.datetime
+    narration: Union[str, Narration]
+    event_id: Optional[str] = None
+
+
 class Accountant:
-    def __init__(self, journal: Journal, config: dict, key: str):
+    def __init__(self, journal: Journal, config: dict, key: str, compact_ledger: bool = False):
         self.journal = journal
         self.config = config
         self.key = key
-        self.ledger = Ledger(journal, config, key)
+        # With minor_units in the config, journal entries carry the amounts as integer minor units
+        self.minor_units: Optional[int] = get_minor_units(config)
+        self.ledger = Ledger(journal, config, key, compact_ledger)
+        self.ledger.attach(journal)
 
     def enter_journal(
             self,
@@ -18,16 +32,117 @@ class Accountant:
             cr_account: str,
             amount: float,
             date: datetime.datetime,
-            narration: str,
+            narration: Union[str, Narration],
             event_id: Optional[str] = None
     ):
-        if amount == 0:
+        entry_amount = amount if self.minor_units is None else to_minor(amount, self.minor_units)
+        if entry_amount == 0:
+            return
+        backdated = self.journal.max_date is not None and date < self.journal.max_date
+        sl_no = self.journal.next_sl_no()
+        dr_entry = JournalEntry(sl_no, dr_account, entry_amount, 0, date, narration, self.key, event_id)
+        self.journal.add_entry(dr_entry)
+        cr_entry = JournalEntry(sl_no + 1, cr_account, 0, entry_amount, date, narration, self.key, event_id)
+        self.journal.add_entry(cr_entry)
+        if backdated and self.ledger.compact:
+            self.ledger.insert_journal_entry(dr_entry)
+            self.ledger.insert_journal_entry(cr_entry)
+        elif backdated:
+            self.ledger.insert_entry(dr_account, cr_account, amount, date, narration, event_id)
+        elif self.ledger.compact:
+            self.ledger.add_journal_entry(dr_entry)
+            self.ledger.add_journal_entry(cr_entry)
+        else:
+            self.ledger.add_entry(dr_account, cr_account, amount, date, narration, event_id)
+        self.ledger.synced(self.journal)
+
+    def enter_journals(self, postings: Iterable[Posting]):
+        """
+        Bulk version of :meth:`enter_journal`. The journal entries of all the postings are validated and added to
+        the journal at once, and then to the ledger. A back dated posting, or one dated in a closed period, is
+        reported by its index in postings, in which case none of the postings are entered.
+
+        :param postings: Postings (or tuples in the same order) ordered by date
+        :raises: InvalidEntryException
+        """
+        postings = [
+            (idx, Posting(*posting)) for idx, posting in enumerate(postings)
+            if (posting[2] if self.minor_units is None else to_minor(posting[2], self.minor_units)) != 0
+        ]
+        for idx, posting in postings:
+            self.journal._check_closed(posting, f'posting {idx} of the batch')
+        if self.journal.allow_backdated:
+            for _, posting in postings:
+                self.enter_journal(*posting)
             return
-        self.journal.add_entry(
-            JournalEntry(len(self.journal.entries), dr_account, amount, 0, date, narration, self.key, event_id))
-        self.journal.add_entry(
-            JournalEntry(len(self.journal.entries), cr_account, 0, amount, date, narration, self.key, event_id))
-        self.ledger.add_entry(dr_account, cr_account, amount, date, narration, event_id)
+        max_date = self.journal.max_date
+        for idx, posting in postings:
+            if max_date is not None and posting.date < max_date:
+                raise InvalidEntryException(
+                    f'Backdated entries cannot be added for posting {idx} of the batch with '
+                    f'entry_date: {posting.date.strftime("%d-%m-%Y %H:%M:%S")} '
+                    f'and max_date: {max_date.strftime("%d-%m-%Y %H:%M:%S")}'
+                )
+            max_date = posting.date
+        postings = [posting for _, posting in postings]
+        sl_no, entries = self.journal.next_sl_no(), []
+        for posting in postings:
+            amount = posting.amount if self.minor_units is None else to_minor(posting.amount, self.minor_units)
+            entries.append(JournalEntry(
+                sl_no, posting.dr_account, amount, 0, posting.date, posting.narration, self.key, posting.event_id
+            ))
+            entries.append(JournalEntry(
+                sl_no + 1, posting.cr_account, 0, amount, posting.date, posting.narration, self.key, posting.event_id
+            ))
+            sl_no += 2
+        self.journal.add_entries(entries)
+        if self.ledger.compact:
+            for entry in entries:
+                self.ledger.add_journal_entry(entry)
+        else:
+            for posting in postings:
+                self.ledger.add_entry(*posting)
+        self.ledger.synced(self.journal)
+
+    def close_period(
+            self,
+            cutoff: datetime.datetime,
+            archive: Optional[Journal] = None,
+            narration: str = 'Opening balance'
+    ) -> List[JournalEntry]:
+        """
+        Closes the period till cutoff. The journal entries on or before cutoff are collapsed into an opening entry
+        per account dated cutoff, carrying the ledger balance as of cutoff, and the ledger is built again from the
+        compacted journal. Balances as of cutoff or later stay the same; entries before cutoff, and their aging,
+        are no longer available. Closing again moves only the entries after the previous openings to the archive,
+        so the archive holds each original entry once.
+
+        :param cutoff: Date till which the period is closed
+        :param archive: Optional journal (e.g. :class:`~pyluca.journal_file.MappedJournal`) to which the removed
+            entries are added, renumbered to follow the entries of the archive
+        :param narration: Narration of the opening entries
+        :return: The removed entries
+        :raises: ValueError
+        """
+        openings = []
+        for account, account_ledger in self.ledger.ledgers.items():
+            # Balances as kept by the account ledgers, i.e. in minor units if so
+            balance = account_ledger.get_balance(cutoff)
+            if balance == 0:
+                continue
+            if account_ledger.balance_type == BalanceType.CREDIT:
+                balance = -balance
+            openings.append(JournalEntry(
+                len(openings), account, max(balance, 0), max(-balance, 0), cutoff, narration, self.key, None
+            ))
+        removed = self.journal.compact(cutoff, openings)
+        if archive is not None:
+            for sl_no, entry in enumerate(removed, len(archive.entries)):
+                entry.sl_no = sl_no
+            archive.add_entries(removed)
+        self.ledger = Ledger(self.journal, self.config, self.key, self.ledger.compact)
+        self.ledger.attach(self.journal)
+        return removed
 
     def record(
             self,
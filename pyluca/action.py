@@ -1,8 +1,13 @@
 import re
 import json
-from typing import Union
+import time
+from functools import lru_cache
+from itertools import islice, groupby
+from typing import Union, Callable, Dict, List, Iterable, NamedTuple, Optional
+import numpy as np
 from pyluca.accountant import Accountant
 from pyluca.event import Event
+from pyluca.journal import Narration
 
 _OPERATOR_CONFIG = {
     '*': lambda a, b: a * b,
@@ -52,13 +57,53 @@ def _get_param(
     raise NotImplementedError(f'param {key} not implemented')
 
 
+_PLACEHOLDER = re.compile(r"\{([^}]+)\}")
+_FORMATTABLE_NAME = re.compile(r'[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)?')
+
+
+class _NarrationTemplate:
+    """
+    A narration template parsed once. Placeholders are substituted one after the other with ``re.sub`` using the
+    placeholder name as the pattern. When the names can only match their own placeholders (checked here) and the
+    values cannot create new matches (checked on render), the narration is built by a plain join instead.
+    """
+    def __init__(self, narration: str):
+        self.narration = narration
+        self.names: List[str] = _PLACEHOLDER.findall(narration)
+        pieces = _PLACEHOLDER.split(narration)
+        self.literals: List[str] = [re.sub(r'[{}]', '', literal) for literal in pieces[::2]]
+        self.formattable = all(_FORMATTABLE_NAME.fullmatch(name) for name in self.names) and all(
+            [m.span() for m in re.finditer(name, narration)] == [
+                (m.start(1), m.end(1)) for m in _PLACEHOLDER.finditer(narration) if m.group(1) == name
+            ]
+            for name in set(self.names)
+        )
+        unsafe = {'\\', '{', '}', *[part for name in self.names for part in name.split('.')]}
+        self.unsafe = re.compile('|'.join(re.escape(u) for u in sorted(unsafe)))
+
+    def render(self, values: list) -> str:
+        if not self.names:
+            return self.narration
+        if self.formattable and all(type(value) is str and not self.unsafe.search(value) for value in values):
+            parts = [self.literals[0]]
+            for value, literal in zip(values, self.literals[1:]):
+                parts.append(value)
+                parts.append(literal)
+            return ''.join(parts)
+        narration = self.narration
+        for name, value in zip(self.names, values):
+            narration = re.sub(name, value, narration)
+        return re.sub(r'[{}]', '', narration)
+
+
+@lru_cache(maxsize=1024)
+def _narration_template(narration: str) -> _NarrationTemplate:
+    return _NarrationTemplate(narration)
+
+
 def _parse_narration(narration: str, event: Event, accountant: Accountant, context: dict):
-    matches = re.findall("\{([^}]+)\}", narration)
-    if matches:
-        for match in matches:
-            narration = re.sub(match, _get_param(match, event, accountant, context), narration)
-        narration = re.sub(r'[{}]', '', narration)
-    return narration
+    template = _narration_template(narration)
+    return template.render([_get_param(name, event, accountant, context) for name in template.names])
 
 
 def _get_narration(action: dict, event: Event, accountant: Accountant, context: dict):
@@ -104,10 +149,451 @@ def _apply_action(
         raise NotImplementedError(f'"{action_type}" is not a valid action type!')
 
 
-def apply(event: Event, accountant: Accountant, context: dict = None, external_actions: dict = None):
+def apply(
+        event: Event,
+        accountant: Accountant,
+        context: dict = None,
+        external_actions: dict = None,
+        plan: 'ActionPlan' = None
+):
+    if plan is not None:
+        return plan.apply(event, accountant, context, external_actions)
     context = context if context else {}
     event_config = accountant.config['actions_config']['on_event'][event.__class__.__name__]
     common_actions = accountant.config['actions_config'].get('common_actions', {})
     external_actions = external_actions if external_actions else {}
     for action in event_config['actions']:
         _apply_action(action, event, accountant, context, common_actions, external_actions)
+
+
+def _compile_fallback(key: Union[str, list, dict], scope: dict) -> Callable:
+    # Anything not resolvable at compile time (runtime context keys, malformed params) is left to the interpreter
+    if not scope:
+        return lambda event, accountant, context: _get_param(key, event, accountant, context)
+    return lambda event, accountant, context: _get_param(key, event, accountant, {**context, **scope})
+
+
+def _compile_context_param(key: str, scope: dict) -> Callable:
+    next_key = key.replace('context.', '')
+    if next_key in scope:
+        return _compile_param(scope[next_key], scope)
+    return _compile_fallback(key, scope)
+
+
+def _compile_attr_param(key: str) -> Callable:
+    def _get_attr(event: Event, accountant: Accountant, context: dict):
+        try:
+            return getattr(event, key)
+        except AttributeError:
+            raise NotImplementedError(f'param {key} not implemented')
+    return _get_attr
+
+
+def _compile_str_param(key: str, scope: dict) -> Callable:
+    if key.startswith('str.'):
+        value = key.replace('str.', '')
+        return lambda event, accountant, context: value
+    if key.startswith('context.'):
+        return _compile_context_param(key, scope)
+    if key.startswith('balance.'):
+        account = key.replace('balance.', '')
+        return lambda event, accountant, context: accountant.ledger.get_account_balance(account)
+    return _compile_attr_param(key)
+
+
+def _compile_param(key: Union[str, list, dict], scope: dict) -> Callable:
+    if key is None:
+        return lambda event, accountant, context: None
+    if type(key) in [int, float]:
+        return lambda event, accountant, context: key
+    if isinstance(key, dict) and key.get('type') in _OPERATOR_CONFIG:
+        return _compile_operator(key, scope)
+    if isinstance(key, str):
+        return _compile_str_param(key, scope)
+    return _compile_fallback(key, scope)
+
+
+def _compile_operator(operator: dict, scope: dict) -> Callable:
+    op = _OPERATOR_CONFIG[operator['type']]
+    get_a, get_b = _compile_param(operator['a'], scope), _compile_param(operator.get('b'), scope)
+    return lambda event, accountant, context: op(
+        get_a(event, accountant, context),
+        get_b(event, accountant, context)
+    )
+
+
+def _compile_narration(action: dict, scope: dict, lazy_meta: bool = False) -> Callable:
+    template = _narration_template(action['narration'])
+    params = [_compile_param(name, scope) for name in template.names]
+    meta = {k: _compile_param(v, scope) for k, v in action['meta'].items()} if action.get('meta') else None
+
+    def _narration(event: Event, accountant: Accountant, context: dict):
+        text = template.render([get_param(event, accountant, context) for get_param in params])
+        if meta:
+            values = {k: get(event, accountant, context) for k, get in meta.items()}
+            if lazy_meta:
+                return Narration(text, values)
+            text = f'{text} ##{json.dumps(values)}##'
+        return text
+    return _narration
+
+
+def _compile_je(action: dict, scope: dict, lazy_meta: bool) -> Callable:
+    dr_account, cr_account = action['dr_account'], action['cr_account']
+    get_amount, get_narration = _compile_param(action['amount'], scope), _compile_narration(action, scope, lazy_meta)
+
+    def _run(event: Event, accountant: Accountant, context: dict, external_actions: dict):
+        accountant.enter_journal(
+            dr_account,
+            cr_account,
+            get_amount(event, accountant, context),
+            event.date,
+            get_narration(event, accountant, context),
+            event.event_id
+        )
+    return _run
+
+
+def _compile_common_action(action: dict, scope: dict, common_actions: dict, lazy_meta: bool) -> Callable:
+    sub_scope = {**scope, **action.get('context', {})}
+    sub_actions = [
+        _compile_action(sub_action, sub_scope, common_actions, lazy_meta)
+        for sub_action in common_actions[action['type'].replace('action.', '')]['actions']
+    ]
+
+    def _run(event: Event, accountant: Accountant, context: dict, external_actions: dict):
+        for sub_action in sub_actions:
+            sub_action(event, accountant, context, external_actions)
+    return _run
+
+
+def _compile_external_action(action: dict, scope: dict) -> Callable:
+    name = action['type'].replace('external_action.', '')
+    kwargs = {k: _compile_param(v, scope) for k, v in action.get('context', {}).items()}
+
+    def _run(event: Event, accountant: Accountant, context: dict, external_actions: dict):
+        external_actions[name](**{k: get(event, accountant, context) for k, get in kwargs.items()})
+    return _run
+
+
+def _compile_iff(action: dict, scope: dict, run: Callable) -> Callable:
+    if not action.get('iff'):
+        return run
+    get_iff = _compile_param(action['iff'], scope)
+
+    def _run_iff(event: Event, accountant: Accountant, context: dict, external_actions: dict):
+        if get_iff(event, accountant, context):
+            run(event, accountant, context, external_actions)
+    return _run_iff
+
+
+def _compile_action(action: dict, scope: dict, common_actions: dict, lazy_meta: bool = False) -> Callable:
+    action_type = action.get('type', 'je')
+    if action_type == 'je':
+        return _compile_iff(action, scope, _compile_je(action, scope, lazy_meta))
+    if action_type.startswith('action.') and action_type.replace('action.', '') in common_actions:
+        return _compile_iff(action, scope, _compile_common_action(action, scope, common_actions, lazy_meta))
+    if action_type.startswith('external_action.'):
+        return _compile_iff(action, scope, _compile_external_action(action, scope))
+
+    def _run(event: Event, accountant: Accountant, context: dict, external_actions: dict):
+        _apply_action(action, event, accountant, {**context, **scope}, common_actions, external_actions)
+    return _run
+
+
+class ActionPlan:
+    """
+    A compiled form of the ``actions_config`` of an accounting config. Parameters, operators, narrations and
+    common actions are resolved once into callables per event class, so applying an event does not re-interpret
+    the config dicts. Journals produced are identical to :func:`apply` without a plan.
+
+    :param config: Accounting config containing ``actions_config``
+    :param lazy_meta: Pass narrations having meta as :class:`~pyluca.journal.Narration` so the meta is serialized
+        only when the narration is read as a string
+    """
+    def __init__(self, config: dict, lazy_meta: bool = False):
+        self.lazy_meta = lazy_meta
+        self.actions_config: dict = config['actions_config']
+        self.common_actions: dict = config['actions_config'].get('common_actions', {})
+        self.on_event: Dict[str, List[Callable]] = {
+            event_name: [_compile_action(action, {}, self.common_actions, lazy_meta) for action in event_config['actions']]
+            for event_name, event_config in config['actions_config']['on_event'].items()
+        }
+
+    def apply(self, event: Event, accountant: Accountant, context: dict = None, external_actions: dict = None):
+        context = context if context else {}
+        external_actions = external_actions if external_actions else {}
+        for action in self.on_event[event.__class__.__name__]:
+            action(event, accountant, context, external_actions)
+
+
+def compile_actions(config: dict, lazy_meta: bool = False) -> ActionPlan:
+    """
+    Compiles the ``actions_config`` of the config into a reusable :class:`ActionPlan`. Compile once per config
+    and pass the plan to :func:`apply` for every event.
+
+    :param config: Accounting config containing ``actions_config``
+    :param lazy_meta: See :class:`ActionPlan`
+    :return: ActionPlan
+    """
+    return ActionPlan(config, lazy_meta)
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+_VECTOR_OPERATOR_CONFIG = {
+    '*': np.multiply,
+    '+': np.add,
+    '-': np.subtract,
+    '/': np.true_divide,
+    'min': np.minimum,
+    'max': np.maximum,
+    '==': np.equal,
+    '!=': np.not_equal,
+    '>': np.greater,
+    '<': np.less,
+    '>=': np.greater_equal,
+    '<=': np.less_equal
+}
+_ARITHMETIC_OPERATORS = {'*', '+', '-', '/', 'min', 'max'}
+# Bound on integer operands so that int64 arithmetic cannot overflow where python ints would not
+_MAX_VECTOR_INT = 2 ** 31
+
+
+def _check_operand(value, operator: str):
+    kind = np.asarray(value).dtype.kind
+    if kind not in 'iufb':
+        raise _NotVectorizable()
+    if operator in _ARITHMETIC_OPERATORS:
+        if kind == 'b':
+            raise _NotVectorizable()
+        if kind in 'iu' and np.size(value) and np.abs(value).max() >= _MAX_VECTOR_INT:
+            raise _NotVectorizable()
+    return kind
+
+
+def _compile_vector_operator(operator: dict, scope: dict, context: dict) -> Optional[Callable]:
+    operator_type = operator['type']
+    if operator_type == '!':
+        get_a = _compile_vector_param(operator['a'], scope, context)
+        if get_a is None:
+            return None
+        return lambda events: np.logical_not(get_a(events))
+    if operator_type not in _VECTOR_OPERATOR_CONFIG:
+        return None
+    op = _VECTOR_OPERATOR_CONFIG[operator_type]
+    get_a = _compile_vector_param(operator['a'], scope, context)
+    get_b = _compile_vector_param(operator.get('b'), scope, context)
+    if get_a is None or get_b is None:
+        return None
+
+    def _operator(events: List[Event]):
+        a, b = get_a(events), get_b(events)
+        kind_a, kind_b = _check_operand(a, operator_type), _check_operand(b, operator_type)
+        # python min/max return one of the operands as is, so mixing ints and floats would change the type
+        if operator_type in ['min', 'max'] and kind_a != kind_b:
+            raise _NotVectorizable()
+        return op(a, b)
+    return _operator
+
+
+def _compile_vector_param(key: Union[str, list, dict], scope: dict, context: dict) -> Optional[Callable]:
+    """
+    Compiles a param into a function evaluating it for a list of events of the same class at once. Returns None
+    when the param depends on balances or on anything which is not a number.
+    """
+    if type(key) in [int, float]:
+        return lambda events: key
+    if isinstance(key, dict) and key.get('type'):
+        return _compile_vector_operator(key, scope, context)
+    if not isinstance(key, str) or key.startswith('str.') or key.startswith('balance.'):
+        return None
+    if key.startswith('context.'):
+        next_key = key.replace('context.', '')
+        if next_key in scope:
+            return _compile_vector_param(scope[next_key], scope, context)
+        if type(context.get(next_key)) in [int, float]:
+            value = context[next_key]
+            return lambda events: value
+        return None
+
+    def _get_attr(events: List[Event]):
+        values = [getattr(event, key, None) for event in events]
+        if len({type(value) for value in values}) != 1 or type(values[0]) not in [int, float, bool]:
+            raise _NotVectorizable()
+        return np.array(values)
+    return _get_attr
+
+
+class _VectorJournalEntry(NamedTuple):
+    scalar: Callable
+    dr_account: str
+    cr_account: str
+    get_amounts: Callable
+    get_iffs: Optional[Callable]
+    get_narration: Callable
+
+
+def _vectorize_actions(
+        actions: List[dict],
+        scope: dict,
+        context: dict,
+        common_actions: dict,
+        lazy_meta: bool = False
+) -> list:
+    steps = []
+    for action in actions:
+        action_type = action.get('type', 'je')
+        if action_type.startswith('action.') and not action.get('iff') \
+                and action_type.replace('action.', '') in common_actions:
+            steps.extend(_vectorize_actions(
+                common_actions[action_type.replace('action.', '')]['actions'],
+                {**scope, **action.get('context', {})},
+                context,
+                common_actions,
+                lazy_meta
+            ))
+            continue
+        scalar = _compile_action(action, scope, common_actions, lazy_meta)
+        if action_type != 'je':
+            steps.append(scalar)
+            continue
+        get_amounts = _compile_vector_param(action['amount'], scope, context)
+        get_iffs = _compile_vector_param(action['iff'], scope, context) if action.get('iff') else None
+        if get_amounts is None or (action.get('iff') and get_iffs is None):
+            steps.append(scalar)
+            continue
+        steps.append(_VectorJournalEntry(
+            scalar,
+            action['dr_account'],
+            action['cr_account'],
+            get_amounts,
+            get_iffs,
+            _compile_narration(action, scope, lazy_meta)
+        ))
+    return steps
+
+
+def _evaluate_vector(get_values: Callable, events: List[Event]) -> Optional[list]:
+    try:
+        with np.errstate(all='raise'):
+            values = get_values(events)
+            kind = np.asarray(values).dtype.kind
+            if kind not in 'iufb':
+                return None
+            return np.broadcast_to(values, (len(events),)).tolist()
+    except (_NotVectorizable, FloatingPointError, OverflowError):
+        return None
+
+
+def _apply_vectorized(
+        steps: list,
+        events: List[Event],
+        accountant: Accountant,
+        context: dict,
+        external_actions: dict
+):
+    values = []
+    for step in steps:
+        if not isinstance(step, _VectorJournalEntry):
+            values.append(None)
+            continue
+        amounts = _evaluate_vector(step.get_amounts, events)
+        iffs = _evaluate_vector(step.get_iffs, events) if step.get_iffs is not None and amounts is not None else None
+        values.append((amounts, iffs) if amounts is not None and (step.get_iffs is None or iffs is not None) else None)
+
+    for idx, event in enumerate(events):
+        for step, value in zip(steps, values):
+            if value is None:
+                (step.scalar if isinstance(step, _VectorJournalEntry) else step)(
+                    event, accountant, context, external_actions
+                )
+                continue
+            amounts, iffs = value
+            if iffs is not None and not iffs[idx]:
+                continue
+            accountant.enter_journal(
+                step.dr_account,
+                step.cr_account,
+                amounts[idx],
+                event.date,
+                step.get_narration(event, accountant, context),
+                event.event_id
+            )
+
+
+class BatchStats(NamedTuple):
+    events: int
+    entries: int
+    seconds: float
+
+
+def apply_many(
+        events: Iterable[Event],
+        accountant: Accountant,
+        context: dict = None,
+        external_actions: dict = None,
+        plan: ActionPlan = None,
+        batch_size: int = 10000,
+        vectorize: bool = False
+) -> List[BatchStats]:
+    """
+    Applies a date ordered stream of events on the accountant. The actions config is compiled once (unless a plan
+    is passed) and the per event setup of :func:`apply` is done once for the whole stream.
+
+    :param events: Iterable or generator of events, ordered by date
+    :param accountant: Accountant to apply the events on
+    :param context: Optional context shared by all the events
+    :param external_actions: Optional external action handlers
+    :param plan: Optional pre compiled plan, see :func:`compile_actions`
+    :param batch_size: Number of events per reported batch
+    :param vectorize: Evaluate the ``amount`` and ``iff`` of journal entry actions that do not depend on balances
+        with numpy, for each run of consecutive events of the same class in a batch
+    :return: Stats (events, journal entries and time taken) of each batch
+    """
+    plan = plan if plan is not None else compile_actions(accountant.config)
+    context = context if context else {}
+    external_actions = external_actions if external_actions else {}
+    if vectorize:
+        return _apply_many_vectorized(events, accountant, context, external_actions, plan, batch_size)
+    on_event, journal_entries = plan.on_event, accountant.journal.entries
+    stats: List[BatchStats] = []
+    count, entries, start = 0, len(journal_entries), time.perf_counter()
+    for event in events:
+        for action in on_event[event.__class__.__name__]:
+            action(event, accountant, context, external_actions)
+        count += 1
+        if count == batch_size:
+            stats.append(BatchStats(count, len(journal_entries) - entries, time.perf_counter() - start))
+            count, entries, start = 0, len(journal_entries), time.perf_counter()
+    if count:
+        stats.append(BatchStats(count, len(journal_entries) - entries, time.perf_counter() - start))
+    return stats
+
+
+def _apply_many_vectorized(
+        events: Iterable[Event],
+        accountant: Accountant,
+        context: dict,
+        external_actions: dict,
+        plan: ActionPlan,
+        batch_size: int
+) -> List[BatchStats]:
+    vector_plans: Dict[str, list] = {}
+    journal_entries = accountant.journal.entries
+    stats: List[BatchStats] = []
+    events = iter(events)
+    batch = list(islice(events, batch_size))
+    while batch:
+        entries, start = len(journal_entries), time.perf_counter()
+        for event_name, run in groupby(batch, key=lambda e: e.__class__.__name__):
+            if event_name not in vector_plans:
+                vector_plans[event_name] = _vectorize_actions(
+                    plan.actions_config['on_event'][event_name]['actions'], {}, context, plan.common_actions, plan.lazy_meta
+                )
+            _apply_vectorized(vector_plans[event_name], list(run), accountant, context, external_actions)
+        stats.append(BatchStats(len(batch), len(journal_entries) - entries, time.perf_counter() - start))
+        batch = list(islice(events, batch_size))
+    return stats
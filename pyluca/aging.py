@@ -1,9 +1,10 @@
 import json
 import re
 from datetime import datetime
-from typing import NamedTuple, List, Optional, Dict, Tuple
+from typing import NamedTuple, List, Optional, Dict, Tuple, Callable
 from pyluca.account_config import BalanceType
-from pyluca.journal import JournalEntry
+from pyluca.amounts import get_minor_units, to_minor, to_major
+from pyluca.journal import JournalEntry, Narration
 from pyluca.amount_counter import AmountCounter
 
 
@@ -43,7 +44,7 @@ def __pay_counters(
         return 0, last_unpaid_age_idx
     rem_amount = amount
     while rem_amount > 0 and last_unpaid_age_idx < len(ages):
-        _, rem_amount = ages[last_unpaid_age_idx].counter.pay(rem_amount, date, {'entry': entry.__dict__})
+        _, rem_amount = ages[last_unpaid_age_idx].counter.pay(rem_amount, date, {'entry': entry.as_dict()})
         if ages[last_unpaid_age_idx].counter.is_paid():
             last_unpaid_age_idx += 1
         else:
@@ -55,12 +56,16 @@ def __update_account_aging(account_balance_type: str, entry: JournalEntry, aging
     positive_amount = entry.cr_amount if account_balance_type == BalanceType.CREDIT.value else entry.dr_amount
     negative_amount = entry.dr_amount if account_balance_type == BalanceType.CREDIT.value else entry.cr_amount
     if positive_amount > 0:
-        meta = re.match('.*##(.*)##.*', entry.narration)
+        if isinstance(entry.narration, Narration):
+            meta = entry.narration.meta if entry.narration.meta else None
+        else:
+            match = re.match('.*##(.*)##.*', entry.narration)
+            meta = json.loads(match.group(1)) if match else None
         aging.ages.append(
             AccountAge(
                 entry.date,
                 AmountCounter(positive_amount),
-                json.loads(meta.group(1)) if meta else None,
+                meta,
                 entry
             )
         )
@@ -74,6 +79,41 @@ def __update_account_aging(account_balance_type: str, entry: JournalEntry, aging
     aging.last_sl_no = entry.sl_no
 
 
+def __convert_entry(entry: dict, convert: Callable[[float], float]) -> dict:
+    return {**entry, 'dr_amount': convert(entry['dr_amount']), 'cr_amount': convert(entry['cr_amount'])}
+
+
+def __convert_aging(aging: AccountAging, convert: Callable[[float], float]):
+    # The journal entries of the ages and of the payment metas are replaced by copies with converted amounts,
+    # the entries of the journal are left as they are
+    aging.excess_amount = convert(aging.excess_amount)
+    for idx, age in enumerate(aging.ages):
+        age.counter.total_amount = convert(age.counter.total_amount)
+        age.counter.paid_amount = convert(age.counter.paid_amount)
+        for payment in age.counter.payments:
+            payment.amount = convert(payment.amount)
+            if payment.meta and 'entry' in payment.meta:
+                payment.meta['entry'] = __convert_entry(payment.meta['entry'], convert)
+        aging.ages[idx] = age._replace(journal_entry=JournalEntry(**__convert_entry(age.journal_entry.as_dict(), convert)))
+
+
+def __to_minor_aging(config: dict, agings: List[AccountAging]):
+    # With minor_units in the config the journal entries are in minor units, while agings (amounts, and the
+    # entries they carry) are returned in major units like the ledger. Previous agings are brought back to minor
+    # units to apply the entries exactly
+    minor_units = get_minor_units(config)
+    if minor_units is not None:
+        for aging in agings:
+            __convert_aging(aging, lambda amount: to_minor(amount, minor_units))
+
+
+def __to_major_aging(config: dict, agings: List[AccountAging]):
+    minor_units = get_minor_units(config)
+    if minor_units is not None:
+        for aging in agings:
+            __convert_aging(aging, lambda value: to_major(value, minor_units))
+
+
 def get_account_aging(
         config: dict,
         entries: List[JournalEntry],
@@ -94,10 +134,12 @@ def get_account_aging(
 
     account_type = config['accounts'][account]['type']
     account_balance_type = config['account_types'][account_type]['balance_type']
+    __to_minor_aging(config, [aging])
     for entry in entries:
         if not should_entry_applied(entry):
             continue
         __update_account_aging(account_balance_type, entry, aging)
+    __to_major_aging(config, [aging])
     return aging
 
 
@@ -122,10 +164,42 @@ def get_accounts_aging(
                and (previous_aging is None or entry.sl_no > previous_aging[entry.account].last_sl_no)
 
     entries = entries[max([aging.last_sl_no for aging in previous_aging.values()]) + 1:] if previous_aging else entries
+    __to_minor_aging(config, list(aging.values()))
     for entry in entries:
         if not should_entry_applied(entry):
             continue
         account_type = config['accounts'][entry.account]['type']
         account_balance_type = config['account_types'][account_type]['balance_type']
         __update_account_aging(account_balance_type, entry, aging[entry.account])
+    __to_major_aging(config, list(aging.values()))
+    return aging
+
+
+def repair_accounts_aging(
+        config: dict,
+        entries: List[JournalEntry],
+        aging: Dict[str, AccountAging],
+        inserted: List[JournalEntry]
+) -> Dict[str, AccountAging]:
+    """
+    Repairs the aging computed by get_accounts_aging after backdated entries are inserted in the journal. Only the
+    aging of the accounts of the inserted entries is computed again; last_sl_no of the others are shifted along
+    with the journal. Entries after the computed aging are not applied, pass the result to get_accounts_aging
+    for them.
+    """
+    positions = sorted([entry.sl_no for entry in inserted])
+
+    def shifted(sl_no: int) -> int:
+        for position in positions:
+            if position <= sl_no:
+                sl_no += 1
+        return sl_no
+
+    horizon = shifted(max([account_aging.last_sl_no for account_aging in aging.values()]))
+    for account_aging in aging.values():
+        if account_aging.last_sl_no >= 0:
+            account_aging.last_sl_no = shifted(account_aging.last_sl_no)
+    for account in set([entry.account for entry in inserted if entry.sl_no < horizon]):
+        if account in aging:
+            aging[account] = get_account_aging(config, entries[:horizon + 1], account, entries[horizon].date)
     return aging
@@ -7,6 +7,8 @@ TOLERANCE_FLOATING = 1e-5
 
 
 class AccountPayment:
+    __slots__ = ('amount', 'date', 'meta')
+
     def __init__(self, amount: float, date: datetime, meta: dict = None):
         self.amount = amount
         self.date = date
@@ -14,18 +16,24 @@ class AccountPayment:
 
 
 class AccountWriterInterface:
+    __slots__ = ()
+
     @abstractmethod
     def write(self, amount: float, date: datetime, due_date: datetime):
         pass
 
 
 class AmountCounterInterface:
+    __slots__ = ()
+
     @abstractmethod
     def pay(self, amount: float, date: datetime, meta: dict = None) -> Tuple[Optional[AccountPayment], float]:
         pass
 
 
 class AmountCounter(AmountCounterInterface):
+    __slots__ = ('total_amount', 'tolerance', 'paid_amount', 'payments')
+
     def __init__(self, total_amount: float, tolerance: float = TOLERANCE_FLOATING):
         self.total_amount = total_amount
         self.tolerance = tolerance
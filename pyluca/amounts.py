@@ -0,0 +1,17 @@
+from typing import Optional
+
+
+def get_minor_units(config: dict) -> Optional[int]:
+    """
+    Number of minor units per unit of amount (e.g. 100 for cents) when the config stores amounts as integer minor
+    units, set with ``minor_units`` in the config. None when amounts are stored as given.
+    """
+    return config.get('minor_units')
+
+
+def to_minor(amount: float, minor_units: int) -> int:
+    return int(round(amount * minor_units))
+
+
+def to_major(value: int, minor_units: int) -> float:
+    return value / minor_units
@@ -1,18 +1,46 @@
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 from pyluca.account_config import BalanceType
 
 
 def add_account_balance(config: dict, ledger: pd.DataFrame, account: str) -> pd.DataFrame:
-    account_type = config['accounts'][account]['type']
-    positive_col, negative_col = 'cr_amount', 'dr_amount'
-    if config['account_types'][account_type]['balance_type'] == BalanceType.DEBIT.value:
-        positive_col, negative_col = 'dr_amount', 'cr_amount'
+    return add_account_balances(config, ledger, [account])
 
-    balance, balances = 0, []
-    for i, row in ledger.iterrows():
-        if row['account'] == account:
-            balance += row[positive_col]
-            balance -= row[negative_col]
-        balances.append(balance)
-    ledger[account] = balances
+
+def add_account_balances(config: dict, ledger: pd.DataFrame, accounts: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Adds a running balance column per account to the ledger dataframe (rows ordered by sl_no), all in one pass
+    over the rows. The running balance adds the positive amount and then subtracts the negative amount of each
+    row of the account, in that order, so balances are the same as adding them up row by row.
+
+    :param config: Accounting config
+    :param ledger: Ledger dataframe with account, dr_amount and cr_amount columns
+    :param accounts: Accounts to add the balance of, defaults to all the accounts of the config
+    """
+    accounts = list(config['accounts'].keys()) if accounts is None else accounts
+    if ledger.empty:
+        for account in accounts:
+            ledger[account] = []
+        return ledger
+
+    account_codes = {account: code for code, account in enumerate(config['accounts'].keys())}
+    codes = ledger['account'].map(account_codes).to_numpy()
+    debit = np.array([
+        config['account_types'][account_config['type']]['balance_type'] == BalanceType.DEBIT.value
+        for account_config in config['accounts'].values()
+    ])[codes]
+    dr_amounts, cr_amounts = ledger['dr_amount'].to_numpy(), ledger['cr_amount'].to_numpy()
+    positive, negative = np.where(debit, dr_amounts, cr_amounts), np.where(debit, cr_amounts, dr_amounts)
+
+    # Positive and negative amounts interleaved, so a cumulative sum is the same sequence of additions
+    amounts = np.zeros(2 * len(ledger), dtype=np.result_type(positive, negative))
+    for account in accounts:
+        mask = codes == account_codes[account]
+        if not mask.any():
+            ledger[account] = 0
+            continue
+        amounts[0::2] = np.where(mask, positive, 0)
+        amounts[1::2] = np.where(mask, -negative, 0)
+        ledger[account] = np.cumsum(amounts)[1::2]
     return ledger
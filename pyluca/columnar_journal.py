@@ -0,0 +1,225 @@
+import datetime
+import types
+from typing import List, Optional, Iterable, Dict, Union, Iterator
+import numpy as np
+from pyluca.journal import Journal, JournalEntry, Narration
+
+EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_COLUMNS = ['sl_nos', 'account_codes', 'dr_amounts', 'cr_amounts', 'dates', 'key_codes', 'event_id_codes']
+
+
+def to_epoch(date: datetime.datetime) -> int:
+    """
+    Converts a naive datetime to microseconds since epoch
+    """
+    if date.tzinfo is not None:
+        raise ValueError('Only naive datetimes are supported')
+    return (date - EPOCH) // _MICROSECOND
+
+
+def from_epoch(value: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=int(value))
+
+
+class _Dictionary:
+    """
+    Encodes repeating strings to int codes. None is encoded as -1
+    """
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code < 0 else self.values[code]
+
+
+class ColumnarJournalEntry:
+    """
+    A lightweight view of a row of :class:`ColumnarJournal`, exposing the attributes of
+    :class:`~pyluca.journal.JournalEntry`.
+    """
+    __slots__ = ('_journal', '_idx')
+
+    def __init__(self, journal: 'ColumnarJournal', idx: int):
+        self._journal = journal
+        self._idx = idx
+
+    @property
+    def sl_no(self) -> int:
+        return int(self._journal.sl_nos[self._idx])
+
+    @property
+    def account(self) -> str:
+        return self._journal.accounts.values[self._journal.account_codes[self._idx]]
+
+    @property
+    def dr_amount(self) -> float:
+        return float(self._journal.dr_amounts[self._idx])
+
+    @property
+    def cr_amount(self) -> float:
+        return float(self._journal.cr_amounts[self._idx])
+
+    @property
+    def date(self) -> datetime.datetime:
+        return from_epoch(self._journal.dates[self._idx])
+
+    @property
+    def narration(self) -> Union[str, Narration]:
+        return self._journal.narrations[self._idx]
+
+    @property
+    def key(self) -> str:
+        return self._journal.keys.decode(self._journal.key_codes[self._idx])
+
+    @property
+    def event_id(self) -> Optional[str]:
+        return self._journal.event_ids.decode(self._journal.event_id_codes[self._idx])
+
+    @property
+    def __dict__(self) -> types.MappingProxyType:
+        return types.MappingProxyType(self.as_dict())
+
+    def as_dict(self) -> dict:
+        return {
+            'sl_no': self.sl_no,
+            'account': self.account,
+            'dr_amount': self.dr_amount,
+            'cr_amount': self.cr_amount,
+            'date': self.date,
+            'narration': self.narration,
+            'key': self.key,
+            'event_id': self.event_id
+        }
+
+
+class ColumnarEntries:
+    """
+    A sequence of :class:`ColumnarJournalEntry` over a range of rows of a :class:`ColumnarJournal`
+    """
+    def __init__(self, journal: 'ColumnarJournal', start: int = 0, stop: Optional[int] = None):
+        self.journal = journal
+        self.start = start
+        self.stop = stop
+
+    def __range(self) -> range:
+        return range(self.start, len(self.journal) if self.stop is None else self.stop)
+
+    def __len__(self) -> int:
+        return len(self.__range())
+
+    def __getitem__(self, item: Union[int, slice]):
+        rows = self.__range()[item]
+        if isinstance(item, slice):
+            if rows.step != 1:
+                return [ColumnarJournalEntry(self.journal, idx) for idx in rows]
+            return ColumnarEntries(self.journal, rows.start, rows.stop)
+        return ColumnarJournalEntry(self.journal, rows)
+
+    def __iter__(self) -> Iterator[ColumnarJournalEntry]:
+        for idx in self.__range():
+            yield ColumnarJournalEntry(self.journal, idx)
+
+    def append(self, entry: JournalEntry):
+        if self.start != 0 or self.stop is not None:
+            raise ValueError('Entries can be appended only to the journal')
+        self.journal.append(entry)
+
+    def extend(self, entries: Iterable[JournalEntry]):
+        for entry in entries:
+            self.append(entry)
+
+
+class ColumnarJournal(Journal):
+    """
+    A journal storing the entries in numpy arrays (dates as microseconds since epoch, account, key and event_id
+    dictionary encoded) instead of a list of :class:`~pyluca.journal.JournalEntry`. ``entries`` gives lightweight
+    views, so it can be used wherever a :class:`~pyluca.journal.Journal` is used. Entries are added with
+    :meth:`~pyluca.journal.Journal.add_entry` as usual.
+
+    :param entries: An optional opening journal entries
+    :param capacity: Initial capacity of the arrays
+    """
+    def __init__(self, entries: Iterable[JournalEntry] = None, capacity: int = 1024):
+        self.__size = 0
+        self.sl_nos = np.empty(capacity, dtype=np.int64)
+        self.account_codes = np.empty(capacity, dtype=np.int32)
+        self.dr_amounts = np.empty(capacity, dtype=np.float64)
+        self.cr_amounts = np.empty(capacity, dtype=np.float64)
+        self.dates = np.empty(capacity, dtype=np.int64)
+        self.key_codes = np.empty(capacity, dtype=np.int32)
+        self.event_id_codes = np.empty(capacity, dtype=np.int32)
+        self.narrations: List[Union[str, Narration]] = []
+        self.accounts = _Dictionary()
+        self.keys = _Dictionary()
+        self.event_ids = _Dictionary()
+        self.max_date: Optional[datetime.datetime] = None
+        for entry in entries if entries else []:
+            self.append(entry)
+            self.max_date = entry.date if self.max_date is None else max(self.max_date, entry.date)
+
+    @property
+    def entries(self) -> ColumnarEntries:
+        return ColumnarEntries(self)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __grow(self, capacity: Optional[int] = None):
+        capacity = max(2 * len(self.sl_nos), 1) if capacity is None else capacity
+        for column in _COLUMNS:
+            array = getattr(self, column)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.__size] = array[:self.__size]
+            setattr(self, column, grown)
+
+    def append(self, entry: JournalEntry):
+        if self.__size == len(self.sl_nos):
+            self.__grow()
+        self.__write(self.__size, entry)
+        self.narrations.append(entry.narration)
+        self.__size += 1
+
+    def __write(self, idx: int, entry: JournalEntry):
+        self.sl_nos[idx] = entry.sl_no
+        self.account_codes[idx] = self.accounts.encode(entry.account)
+        self.dr_amounts[idx] = entry.dr_amount
+        self.cr_amounts[idx] = entry.cr_amount
+        self.dates[idx] = to_epoch(entry.date)
+        self.key_codes[idx] = self.keys.encode(entry.key)
+        self.event_id_codes[idx] = self.event_ids.encode(entry.event_id)
+
+    def compact(self, cutoff: datetime.datetime, openings: List[JournalEntry]) -> List[JournalEntry]:
+        """
+        Same as :meth:`~pyluca.journal.Journal.compact`, moving the kept rows of the arrays after the openings.
+        The removed entries are returned as :class:`~pyluca.journal.JournalEntry`
+        """
+        size = self.__size
+        start = int(np.searchsorted(self.dates[:size], to_epoch(cutoff), side='right'))
+        self._check_compaction(start, cutoff)
+        removed = [JournalEntry(**entry.as_dict()) for entry in self.entries[self.opening_count:start]]
+        new_size = len(openings) + size - start
+        if new_size > len(self.sl_nos):
+            self.__grow(new_size)
+        for column in _COLUMNS:
+            array = getattr(self, column)
+            array[len(openings):new_size] = array[start:size]
+        self.narrations = [opening.narration for opening in openings] + self.narrations[start:size]
+        for idx, opening in enumerate(openings):
+            self.__write(idx, opening)
+        self.sl_nos[:new_size] = np.arange(new_size)
+        self.__size = new_size
+        self._compacted(cutoff, openings)
+        if self.index is not None:
+            self.build_index()
+        return removed
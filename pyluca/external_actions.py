@@ -0,0 +1,133 @@
+import asyncio
+import inspect
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+
+class AsyncExternalActions:
+    """
+    External action handlers which are dispatched asynchronously. Pass it as ``external_actions`` to
+    :func:`~pyluca.action.apply` (or :func:`~pyluca.action.apply_many`); each ``external_action.<name>`` call is
+    enqueued instead of being run inline. Calls are batched per handler and the handler gets the list of kwargs
+    of the batch. Handlers can be coroutine functions, which run on an asyncio loop in a background thread, or
+    plain functions, which run in a pool of ``max_in_flight`` threads so they do not block the loop. An exception
+    raised by a handler is raised by the next enqueue which dispatches a batch, or else by :meth:`flush`.
+
+    :param handlers: Handler per external action name, taking a list of kwargs
+    :param batch_size: Number of calls per batch
+    :param max_in_flight: Max number of batches being handled at once
+    :param max_pending: Max number of calls enqueued but not handled yet. Enqueueing blocks once reached
+    """
+    def __init__(
+            self,
+            handlers: Dict[str, Callable],
+            batch_size: int = 100,
+            max_in_flight: int = 4,
+            max_pending: int = 10000
+    ):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.__pending: Dict[str, List[dict]] = defaultdict(list)
+        self.__outstanding = 0
+        self.__futures: List[Future] = []
+        self.__executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.__condition = threading.Condition()
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(target=self.__loop.run_forever, daemon=True)
+        self.__thread.start()
+        self.__semaphore: asyncio.Semaphore = asyncio.run_coroutine_threadsafe(
+            self.__create_semaphore(max_in_flight), self.__loop
+        ).result()
+
+    @staticmethod
+    async def __create_semaphore(max_in_flight: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(max_in_flight)
+
+    def __getitem__(self, name: str) -> Callable:
+        if name not in self.handlers:
+            raise KeyError(name)
+        return lambda **kwargs: self.enqueue(name, kwargs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.handlers
+
+    def enqueue(self, name: str, kwargs: dict):
+        with self.__condition:
+            while self.__outstanding >= self.max_pending:
+                self.__submit_all()
+                self.__condition.wait()
+            self.__pending[name].append(kwargs)
+            self.__outstanding += 1
+            if len(self.__pending[name]) >= self.batch_size:
+                self.__submit(name)
+
+    def __collect(self):
+        # Drops the handled batches, raising the first exception of a handler among them
+        done = [future for future in self.__futures if future.done()]
+        self.__futures = [future for future in self.__futures if not future.done()]
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def __submit(self, name: str):
+        self.__collect()
+        batch, self.__pending[name] = self.__pending[name], []
+        if batch:
+            self.__futures.append(asyncio.run_coroutine_threadsafe(self.__dispatch(name, batch), self.__loop))
+
+    def __submit_all(self):
+        for name in list(self.__pending.keys()):
+            self.__submit(name)
+
+    async def __dispatch(self, name: str, batch: List[dict]):
+        try:
+            async with self.__semaphore:
+                handler = self.handlers[name]
+                if inspect.iscoroutinefunction(handler):
+                    result = handler(batch)
+                else:
+                    result = await self.__loop.run_in_executor(self.__executor, handler, batch)
+                if asyncio.iscoroutine(result):
+                    await result
+        finally:
+            with self.__condition:
+                self.__outstanding -= len(batch)
+                self.__condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Dispatches the partially filled batches and waits till every enqueued call is handled. Raises the first
+        exception raised by a handler, if any.
+
+        :param timeout: Max seconds to wait
+        """
+        with self.__condition:
+            self.__submit_all()
+            futures, self.__futures = self.__futures, []
+        done, not_done = wait(futures, timeout)
+        with self.__condition:
+            self.__futures.extend(not_done)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def close(self):
+        """
+        Flushes the pending calls and stops the background loop
+        """
+        try:
+            self.flush()
+        finally:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__loop.close()
+            self.__executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
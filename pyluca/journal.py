@@ -1,11 +1,47 @@
 import datetime
-from typing import List, Optional
+import json
+import types
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import List, Optional, Union, Dict, Tuple
 
 
 class InvalidEntryException(Exception):
     pass
 
 
+class Narration:
+    """
+    A narration with structured meta. The meta is serialized to the ``##json##`` suffix only when the narration is
+    read as a string, and compares equal to that string.
+
+    :param text: The narration text
+    :param meta: Meta of the entry
+    """
+    __slots__ = ('text', 'meta', '_str')
+
+    def __init__(self, text: str, meta: Optional[dict] = None):
+        self.text = text
+        self.meta = meta
+        self._str: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._str is None:
+            self._str = f'{self.text} ##{json.dumps(self.meta)}##' if self.meta else self.text
+        return self._str
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Narration, str)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
 class JournalEntry:
     """
     A struct for individual journal entry.
@@ -19,13 +55,15 @@ class JournalEntry:
     :param key: A key to group the journal entries
     :param event_id: Identifier for event caused this entry
     """
+    __slots__ = ('sl_no', 'account', 'dr_amount', 'cr_amount', 'date', 'narration', 'key', 'event_id')
+
     def __init__(
             self, sl_no: int,
             account: str,
             dr_amount: float,
             cr_amount: float,
             date: datetime.datetime,
-            narration: str,
+            narration: Union[str, Narration],
             key: str,
             event_id: Optional[str]
     ):
@@ -38,16 +76,133 @@ class JournalEntry:
         self.key = key
         self.event_id = event_id
 
+    def as_dict(self) -> dict:
+        """
+        The fields of the entry as a new dict
+        """
+        return {field: getattr(self, field) for field in JournalEntry.__slots__}
+
+    @property
+    def __dict__(self) -> types.MappingProxyType:
+        # Read only, as the fields are slots and writes to a dict would not reach the entry. Use as_dict for a dict
+        return types.MappingProxyType(self.as_dict())
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in JournalEntry.__slots__)
+
+    def __setstate__(self, state: tuple):
+        for field, value in zip(JournalEntry.__slots__, state):
+            setattr(self, field, value)
+
+
+class JournalIndex:
+    """
+    Positions of journal entries by event_id, by account and by date. Positions of an account and of the
+    journal are kept sorted by date along with their dates for binary search.
+    """
+    def __init__(self):
+        self.events: Dict[str, List[int]] = defaultdict(list)
+        self.accounts: Dict[str, Tuple[List[datetime.datetime], List[int]]] = {}
+        self.dates: List[datetime.datetime] = []
+        self.positions: List[int] = []
+
+    def add(self, position: int, entry: JournalEntry):
+        if entry.event_id is not None:
+            self.events[entry.event_id].append(position)
+        dates, positions = self.accounts.setdefault(entry.account, ([], []))
+        dates.append(entry.date)
+        positions.append(position)
+        self.dates.append(entry.date)
+        self.positions.append(position)
+
+    def insert(self, position: int, entry: JournalEntry, shifted: List[JournalEntry]):
+        """
+        Adds an entry inserted at position of a journal ordered by date, moving the positions of the shifted
+        entries (the entries after it) by one. Only the tails of the date ordered lists after the date of the
+        entry are touched.
+        """
+        for event_id in {shifted_entry.event_id for shifted_entry in shifted if shifted_entry.event_id is not None}:
+            positions = self.events[event_id]
+            for idx in range(len(positions) - 1, -1, -1):
+                if positions[idx] < position:
+                    break
+                positions[idx] += 1
+        if entry.event_id is not None:
+            insort(self.events[entry.event_id], position)
+        self.accounts.setdefault(entry.account, ([], []))
+        for account, (dates, positions) in self.accounts.items():
+            JournalIndex.__shift(dates, positions, position, entry if account == entry.account else None)
+        JournalIndex.__shift(self.dates, self.positions, position, entry)
+
+    @staticmethod
+    def __shift(
+            dates: List[datetime.datetime],
+            positions: List[int],
+            position: int,
+            entry: Optional[JournalEntry]
+    ):
+        start = bisect_right(dates, entry.date) if entry is not None else len(dates)
+        while start > 0 and positions[start - 1] >= position:
+            start -= 1
+        for idx in range(start, len(positions)):
+            positions[idx] += 1
+        if entry is not None:
+            dates.insert(start, entry.date)
+            positions.insert(start, position)
+
+    @staticmethod
+    def between(
+            dates: List[datetime.datetime],
+            positions: List[int],
+            start: Optional[datetime.datetime],
+            end: Optional[datetime.datetime]
+    ) -> List[int]:
+        lo = 0 if start is None else bisect_left(dates, start)
+        hi = len(dates) if end is None else bisect_right(dates, end)
+        return positions[lo:hi]
+
 
 class Journal:
     """
     A log which maintains list of journal entries.
 
     :param entries: An optional opening journal entries
+    :param indexed: Maintain a :class:`JournalIndex` to look up entries by event, account and date
+    :param allow_backdated: Insert backdated entries after the entries on or before their date instead of
+        raising. The sl_no of the entries are their positions and are renumbered from the inserted entry
+
+    ``version`` is incremented on every change made through the journal, and ``rewrite_version`` is the version of
+    the last change which was not an append (backdated insertion, compaction). ``opening_count`` is the number of
+    opening entries at the head of the journal from the last compaction, and ``closed_till`` its cutoff; entries
+    dated on or before it cannot be added, even with ``allow_backdated``.
     """
-    def __init__(self, entries: List[JournalEntry] = None):
+    index: Optional[JournalIndex] = None
+    allow_backdated: bool = False
+    version: int = 0
+    rewrite_version: int = 0
+    opening_count: int = 0
+    closed_till: Optional[datetime.datetime] = None
+
+    def __init__(self, entries: List[JournalEntry] = None, indexed: bool = False, allow_backdated: bool = False):
         self.entries: List[JournalEntry] = [] if entries is None else entries
         self.max_date: datetime = max([entry.date for entry in entries]) if entries else None
+        self.allow_backdated = allow_backdated
+        if indexed:
+            self.build_index()
+
+    def build_index(self):
+        """
+        Builds the index over the existing entries. The index is maintained on adding entries from then on
+        """
+        self.index = JournalIndex()
+        for position in sorted(range(len(self.entries)), key=lambda idx: self.entries[idx].date):
+            self.index.add(position, self.entries[position])
+
+    def next_sl_no(self) -> int:
+        """
+        sl_no of the next entry added to the journal
+        """
+        return len(self.entries)
 
     def add_entry(self, entry: JournalEntry):
         """
@@ -57,11 +212,167 @@ class Journal:
         :param entry: Entry to be added
         :raises: InvalidEntryException
         """
+        self._check_closed(entry, 'entry')
         if self.max_date is None:
             self.max_date = entry.date
+        if entry.date < self.max_date and self.allow_backdated:
+            self.__insert(entry)
+            return
         if entry.date < self.max_date:
             raise InvalidEntryException(
                 f'Backdated entries cannot be added for entry_date: {entry.date.strftime("%d-%m-%Y %H:%M:%S")} and max_date: {self.max_date.strftime("%d-%m-%Y %H:%M:%S")}'
             )
         self.entries.append(entry)
         self.max_date = entry.date
+        self.version += 1
+        if self.index is not None:
+            self.index.add(len(self.entries) - 1, entry)
+
+    def _check_closed(self, entry: JournalEntry, name: str):
+        if self.closed_till is not None and entry.date <= self.closed_till:
+            raise InvalidEntryException(
+                f'Entries cannot be added to the closed period for {name} with '
+                f'entry_date: {entry.date.strftime("%d-%m-%Y %H:%M:%S")} '
+                f'and closed_till: {self.closed_till.strftime("%d-%m-%Y %H:%M:%S")}'
+            )
+
+    def __insert(self, entry: JournalEntry):
+        start, end = 0, len(self.entries)
+        while start < end:
+            mid = (start + end) // 2
+            if self.entries[mid].date <= entry.date:
+                start = mid + 1
+            else:
+                end = mid
+        self.entries.insert(start, entry)
+        self.version += 1
+        self.rewrite_version = self.version
+        for position in range(start, len(self.entries)):
+            self.entries[position].sl_no = position
+        if self.index is not None:
+            self.index.insert(start, entry, self.entries[start + 1:])
+
+    def add_entries(self, entries: List[JournalEntry]):
+        """
+        Function which takes a batch of entries and adds them to the entries after validating the dates of the
+        whole batch in one pass. Raises exception pointing to the first back dated entry, in which case none of
+        the entries are added
+
+        :param entries: Entries to be added, ordered by date
+        :raises: InvalidEntryException
+        """
+        if self.allow_backdated:
+            for entry in entries:
+                self.add_entry(entry)
+            return
+        max_date = self.max_date
+        for idx, entry in enumerate(entries):
+            self._check_closed(entry, f'entry {idx} of the batch')
+            if max_date is not None and entry.date < max_date:
+                raise InvalidEntryException(
+                    f'Backdated entries cannot be added for entry {idx} of the batch with '
+                    f'entry_date: {entry.date.strftime("%d-%m-%Y %H:%M:%S")} '
+                    f'and max_date: {max_date.strftime("%d-%m-%Y %H:%M:%S")}'
+                )
+            max_date = entry.date
+        start = len(self.entries)
+        self.entries.extend(entries)
+        self.max_date = max_date
+        self.version += 1
+        if self.index is not None:
+            for position, entry in enumerate(entries, start):
+                self.index.add(position, entry)
+
+    def compact(self, cutoff: datetime.datetime, openings: List[JournalEntry]) -> List[JournalEntry]:
+        """
+        Replaces the entries on or before cutoff with the opening entries and renumbers the sl_no of the entries
+        to their positions. Raises exception if cutoff is before the date of the openings of an earlier compaction
+
+        :param cutoff: Entries dated on or before cutoff are removed
+        :param openings: Opening entries dated cutoff
+        :return: The removed entries, without the opening entries of an earlier compaction
+        :raises: ValueError
+        """
+        start, end = 0, len(self.entries)
+        while start < end:
+            mid = (start + end) // 2
+            if self.entries[mid].date <= cutoff:
+                start = mid + 1
+            else:
+                end = mid
+        self._check_compaction(start, cutoff)
+        removed, self.entries = self.entries[self.opening_count:start], openings + self.entries[start:]
+        for position, entry in enumerate(self.entries):
+            entry.sl_no = position
+        self._compacted(cutoff, openings)
+        if self.index is not None:
+            self.build_index()
+        return removed
+
+    def _check_compaction(self, start: int, cutoff: datetime.datetime):
+        if start < self.opening_count:
+            raise ValueError(
+                f'Journal is compacted till {self.entries[0].date.strftime("%d-%m-%Y %H:%M:%S")}, '
+                f'cannot compact till {cutoff.strftime("%d-%m-%Y %H:%M:%S")}'
+            )
+
+    def _compacted(self, cutoff: datetime.datetime, openings: List[JournalEntry]):
+        self.version += 1
+        self.rewrite_version = self.version
+        self.opening_count = len(openings)
+        self.closed_till = cutoff
+        if openings:
+            self.max_date = cutoff if self.max_date is None else max(self.max_date, cutoff)
+
+    def entries_for_event(self, event_id: str) -> List[JournalEntry]:
+        """
+        Entries caused by the event
+
+        :param event_id: Identifier of the event
+        """
+        if self.index is None:
+            return [entry for entry in self.entries if entry.event_id == event_id]
+        return [self.entries[position] for position in self.index.events.get(event_id, [])]
+
+    def entries_for_account(
+            self,
+            account: str,
+            start: Optional[datetime.datetime] = None,
+            end: Optional[datetime.datetime] = None
+    ) -> List[JournalEntry]:
+        """
+        Entries of the account, optionally dated between start and end (both inclusive)
+
+        :param account: The account
+        :param start: Optional start date
+        :param end: Optional end date
+        """
+        if self.index is None:
+            return [
+                entry for entry in sorted(self.entries, key=lambda e: e.date)
+                if entry.account == account and (start is None or entry.date >= start)
+                and (end is None or entry.date <= end)
+            ]
+        dates, positions = self.index.accounts.get(account, ([], []))
+        return [self.entries[position] for position in JournalIndex.between(dates, positions, start, end)]
+
+    def entries_between(
+            self,
+            start: Optional[datetime.datetime] = None,
+            end: Optional[datetime.datetime] = None
+    ) -> List[JournalEntry]:
+        """
+        Entries dated between start and end (both inclusive)
+
+        :param start: Optional start date
+        :param end: Optional end date
+        """
+        if self.index is None:
+            return [
+                entry for entry in sorted(self.entries, key=lambda e: e.date)
+                if (start is None or entry.date >= start) and (end is None or entry.date <= end)
+            ]
+        return [
+            self.entries[position]
+            for position in JournalIndex.between(self.index.dates, self.index.positions, start, end)
+        ]
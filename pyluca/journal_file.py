@@ -0,0 +1,252 @@
+import datetime
+import mmap
+import os
+import struct
+from typing import Optional, Iterator, List
+import numpy as np
+from pyluca.columnar_journal import ColumnarJournal, from_epoch, to_epoch, _Dictionary
+from pyluca.journal import JournalEntry
+
+MAGIC = b'PYLUCAJ1'
+_HEADER = struct.Struct('<8sq')
+_LENGTH = struct.Struct('<I')
+_OFFSET = struct.Struct('<q')
+_PENDING_STRINGS = 4096
+RECORD_DTYPE = np.dtype([
+    ('sl_no', '<i8'),
+    ('date', '<i8'),
+    ('dr_amount', '<f8'),
+    ('cr_amount', '<f8'),
+    ('account', '<i4'),
+    ('key', '<i4'),
+    ('event_id', '<i4'),
+    ('narration', '<i4')
+])
+
+
+class _StringTable:
+    """
+    Append only file of length prefixed utf-8 strings, with a file of fixed width offsets to read a string by
+    its code without loading the table. Both files are memory mapped for reads. Strings appended since the
+    files were last mapped are read from memory, and the files are flushed and mapped again once enough of
+    them are pending.
+    """
+    def __init__(self, path: str):
+        for file_path in [path, f'{path}.idx']:
+            if not os.path.exists(file_path):
+                open(file_path, 'wb').close()
+        self.__file = open(path, 'r+b')
+        self.__index = open(f'{path}.idx', 'r+b')
+        self.__end = self.__file.seek(0, os.SEEK_END)
+        self.size = self.__index.seek(0, os.SEEK_END) // _OFFSET.size
+        self.__data_map: Optional[mmap.mmap] = None
+        self.__index_map: Optional[mmap.mmap] = None
+        self.__mapped = 0
+        self.__pending: List[str] = []
+        self.__dirty = False
+        self.__remap()
+
+    def append(self, value: str) -> int:
+        data = value.encode('utf-8')
+        self.__file.seek(self.__end)
+        self.__file.write(_LENGTH.pack(len(data)) + data)
+        self.__index.seek(self.size * _OFFSET.size)
+        self.__index.write(_OFFSET.pack(self.__end))
+        self.__end += _LENGTH.size + len(data)
+        self.size += 1
+        self.__dirty = True
+        self.__pending.append(value)
+        if len(self.__pending) >= _PENDING_STRINGS:
+            self.__remap()
+        return self.size - 1
+
+    def __flush(self):
+        if self.__dirty:
+            self.__file.flush()
+            self.__index.flush()
+            self.__dirty = False
+
+    def __unmap(self):
+        for table_map in [self.__data_map, self.__index_map]:
+            if table_map is not None:
+                table_map.close()
+        self.__data_map, self.__index_map, self.__mapped = None, None, 0
+        self.__pending = []
+
+    def __remap(self):
+        self.__flush()
+        self.__unmap()
+        if self.size:
+            self.__data_map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__index_map = mmap.mmap(self.__index.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__mapped = self.size
+
+    def __getitem__(self, code: int) -> str:
+        if code >= self.__mapped:
+            return self.__pending[code - self.__mapped]
+        offset, = _OFFSET.unpack_from(self.__index_map, code * _OFFSET.size)
+        length, = _LENGTH.unpack_from(self.__data_map, offset)
+        return self.__data_map[offset + _LENGTH.size:offset + _LENGTH.size + length].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        self.__flush()
+        self.__file.seek(0)
+        data = self.__file.read()
+        offset = 0
+        for _ in range(self.size):
+            length, = _LENGTH.unpack_from(data, offset)
+            yield data[offset + _LENGTH.size:offset + _LENGTH.size + length].decode('utf-8')
+            offset += _LENGTH.size + length
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code < 0 else self[code]
+
+    def sync(self):
+        self.__dirty = False
+        for file in [self.__file, self.__index]:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def close(self):
+        self.__unmap()
+        self.__file.close()
+        self.__index.close()
+
+
+class _PersistentDictionary(_Dictionary):
+    """
+    A dictionary encoding (for accounts and keys) which is loaded at open and appended to its string table
+    """
+    def __init__(self, table: _StringTable):
+        super(_PersistentDictionary, self).__init__()
+        self.table = table
+        for value in table:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is not None and value not in self.codes:
+            self.table.append(value)
+        return super(_PersistentDictionary, self).encode(value)
+
+
+class _Narrations:
+    def __init__(self, journal: 'MappedJournal'):
+        self.journal = journal
+
+    def __getitem__(self, idx: int) -> str:
+        return self.journal.texts[self.journal.narration_codes[idx]]
+
+    def __len__(self) -> int:
+        return len(self.journal)
+
+
+class MappedJournal(ColumnarJournal):
+    """
+    A :class:`~pyluca.columnar_journal.ColumnarJournal` persisted in a directory. Entries are fixed width records
+    in ``records.bin`` which is memory mapped, so reopening a journal does not parse it. Accounts and keys are
+    dictionary encoded in ``accounts.bin`` / ``keys.bin``; narrations and event ids are kept in ``texts.bin``
+    and read on access.
+
+    Entries are appended with :meth:`~pyluca.journal.Journal.add_entry` and are durable once :meth:`flush` is
+    called; entries added after the last flush are not visible when the journal is reopened.
+
+    :param path: Directory of the journal, created if it does not exist
+    :param capacity: Initial capacity (records) of a new journal file
+    """
+    def __init__(self, path: str, capacity: int = 1024):
+        os.makedirs(path, exist_ok=True)
+        records_path = os.path.join(path, 'records.bin')
+        if not os.path.exists(records_path):
+            with open(records_path, 'wb') as file:
+                file.write(_HEADER.pack(MAGIC, 0))
+                file.truncate(_HEADER.size + capacity * RECORD_DTYPE.itemsize)
+        self.path = path
+        self.__file = open(records_path, 'r+b')
+        magic, self.__size = _HEADER.unpack(self.__file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{records_path} is not a pyluca journal file')
+        self.__map((self.__file.seek(0, os.SEEK_END) - _HEADER.size) // RECORD_DTYPE.itemsize)
+        self.accounts = _PersistentDictionary(_StringTable(os.path.join(path, 'accounts.bin')))
+        self.keys = _PersistentDictionary(_StringTable(os.path.join(path, 'keys.bin')))
+        self.texts = _StringTable(os.path.join(path, 'texts.bin'))
+        self.event_ids = self.texts
+        self.narrations = _Narrations(self)
+        self.__last_texts: List[tuple] = [(None, -1), (None, -1)]
+        self.max_date = from_epoch(self.dates[:self.__size].max()) if self.__size else None
+
+    def __map(self, capacity: int):
+        self.records = np.memmap(self.__file, dtype=RECORD_DTYPE, mode='r+', offset=_HEADER.size, shape=(capacity,))
+        self.sl_nos = self.records['sl_no']
+        self.dates = self.records['date']
+        self.dr_amounts = self.records['dr_amount']
+        self.cr_amounts = self.records['cr_amount']
+        self.account_codes = self.records['account']
+        self.key_codes = self.records['key']
+        self.event_id_codes = self.records['event_id']
+        self.narration_codes = self.records['narration']
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __grow(self):
+        self.records.flush()
+        capacity = max(2 * len(self.records), 1)
+        self.__file.truncate(_HEADER.size + capacity * RECORD_DTYPE.itemsize)
+        self.__map(capacity)
+
+    def __encode_text(self, column: int, value: Optional[str]) -> int:
+        # Both lines of a journal entry carry the same narration and event id, so repeats are stored once
+        if value is None:
+            return -1
+        last_value, last_code = self.__last_texts[column]
+        if value != last_value:
+            last_code = self.texts.append(value)
+            self.__last_texts[column] = (value, last_code)
+        return last_code
+
+    def append(self, entry: JournalEntry):
+        if self.__size == len(self.records):
+            self.__grow()
+        self.records[self.__size] = (
+            entry.sl_no,
+            to_epoch(entry.date),
+            entry.dr_amount,
+            entry.cr_amount,
+            self.accounts.encode(entry.account),
+            self.keys.encode(entry.key),
+            self.__encode_text(0, entry.event_id),
+            self.__encode_text(1, str(entry.narration))
+        )
+        self.__size += 1
+
+    def compact(self, cutoff: datetime.datetime, openings: List[JournalEntry]) -> List[JournalEntry]:
+        raise ValueError(
+            'MappedJournal is append only and cannot be compacted, it can be the archive of a closed period instead'
+        )
+
+    def flush(self):
+        """
+        Makes the entries added so far durable
+        """
+        for table in [self.accounts.table, self.keys.table, self.texts]:
+            table.sync()
+        self.records.flush()
+        self.__file.seek(0)
+        self.__file.write(_HEADER.pack(MAGIC, self.__size))
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def close(self):
+        self.flush()
+        del self.records, self.sl_nos, self.dates, self.dr_amounts, self.cr_amounts
+        del self.account_codes, self.key_codes, self.event_id_codes, self.narration_codes
+        for table in [self.accounts.table, self.keys.table, self.texts]:
+            table.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,142 @@
+import csv
+import datetime
+import json
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
+from pyluca.journal import Journal, JournalEntry, Narration
+from pyluca.ledger import Ledger
+
+ENTRY_FIELDS = ['sl_no', 'account', 'dr_amount', 'cr_amount', 'date', 'narration', 'key', 'event_id']
+
+
+@contextmanager
+def _open(file: Union[str, TextIO], mode: str) -> Iterator[TextIO]:
+    if not isinstance(file, str):
+        yield file
+        return
+    with open(file, mode, newline='') as opened:
+        yield opened
+
+
+def _entry(row: dict) -> JournalEntry:
+    return JournalEntry(
+        int(row['sl_no']),
+        row['account'],
+        float(row['dr_amount']),
+        float(row['cr_amount']),
+        row['date'] if isinstance(row['date'], datetime.datetime) else datetime.datetime.fromisoformat(row['date']),
+        row['narration'],
+        row['key'],
+        row['event_id'] if row['event_id'] not in ['', None] else None
+    )
+
+
+def _chunks(rows: Iterable[dict], chunk_size: int) -> Iterator[List[JournalEntry]]:
+    entries = map(_entry, rows)
+    chunk = list(islice(entries, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(entries, chunk_size))
+
+
+def _value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Narration):
+        return str(value)
+    return value
+
+
+def _row(row: Union[JournalEntry, dict]) -> dict:
+    return {field: _value(value) for field, value in (row if isinstance(row, dict) else row.as_dict()).items()}
+
+
+def read_csv(file: Union[str, TextIO], chunk_size: int = 10000) -> Iterator[List[JournalEntry]]:
+    """
+    Reads journal entries from a csv file with a header of :data:`ENTRY_FIELDS`, as written by :func:`write_csv`
+
+    :param file: Path or file object
+    :param chunk_size: Number of entries per chunk
+    :return: Iterator of chunks of entries
+    """
+    with _open(file, 'r') as opened:
+        yield from _chunks(csv.DictReader(opened), chunk_size)
+
+
+def read_jsonl(file: Union[str, TextIO], chunk_size: int = 10000) -> Iterator[List[JournalEntry]]:
+    """
+    Reads journal entries from a file with a json object per line, as written by :func:`write_jsonl`
+
+    :param file: Path or file object
+    :param chunk_size: Number of entries per chunk
+    :return: Iterator of chunks of entries
+    """
+    with _open(file, 'r') as opened:
+        yield from _chunks((json.loads(line) for line in opened if line.strip()), chunk_size)
+
+
+def write_csv(
+        rows: Iterable[Union[JournalEntry, dict]],
+        file: Union[str, TextIO],
+        fields: Optional[List[str]] = None
+) -> int:
+    """
+    Writes journal entries, or dicts like the rows of :meth:`~pyluca.ledger.Ledger.iter_ledger`, as csv rows
+
+    :param rows: Entries or dicts
+    :param file: Path or file object
+    :param fields: Columns, defaults to :data:`ENTRY_FIELDS` for entries and the keys of the first row for dicts
+    :return: Number of rows written
+    """
+    count = 0
+    with _open(file, 'w') as opened:
+        writer = None
+        for row in rows:
+            if writer is None:
+                if fields is None:
+                    fields = list(row.keys()) if isinstance(row, dict) else ENTRY_FIELDS
+                writer = csv.DictWriter(opened, fields, extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow(_row(row))
+            count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Union[JournalEntry, dict]], file: Union[str, TextIO]) -> int:
+    """
+    Writes journal entries, or dicts like the rows of :meth:`~pyluca.ledger.Ledger.iter_ledger`, as a json object
+    per line
+
+    :param rows: Entries or dicts
+    :param file: Path or file object
+    :return: Number of rows written
+    """
+    count = 0
+    with _open(file, 'w') as opened:
+        for row in rows:
+            opened.write(json.dumps(_row(row)))
+            opened.write('\n')
+            count += 1
+    return count
+
+
+def load(chunks: Iterable[List[JournalEntry]], journal: Journal, ledger: Optional[Ledger] = None) -> Journal:
+    """
+    Adds the chunks of entries to the journal, and to the ledger if passed, one chunk at a time. The ledger is
+    marked in sync with the journal after each chunk, so an attached ledger (see
+    :meth:`~pyluca.ledger.Ledger.for_journal`) stays attached
+
+    :param chunks: Chunks of entries ordered by date, e.g. from :func:`read_csv`
+    :param journal: Journal to add the entries to
+    :param ledger: Optional ledger of the journal to keep up to date
+    :raises: InvalidEntryException
+    """
+    for chunk in chunks:
+        journal.add_entries(chunk)
+        if ledger is None:
+            continue
+        for entry in chunk:
+            ledger.add_journal_entry(entry)
+        ledger.synced(journal)
+    return journal
@@ -1,44 +1,112 @@
-from typing import List, Optional, NamedTuple, Dict
+import heapq
+from bisect import bisect_right
+import math
+from array import array
+from weakref import WeakKeyDictionary
+from typing import List, Optional, NamedTuple, Dict, Union, Iterator, Iterable
 from datetime import datetime
+import numpy as np
 import pandas as pd
-from pyluca.account_config import BalanceType
-from pyluca.balances import add_account_balance
-from pyluca.journal import Journal
+from pyluca.account_config import BalanceType, ChartOfAccounts
+from pyluca.amounts import get_minor_units, to_minor, to_major
+from pyluca.amount_counter import TOLERANCE_FLOATING
+from pyluca.balances import add_account_balance, add_account_balances
+from pyluca.journal import Journal, JournalEntry, Narration
 
 
 class InvalidLedgerEntry(Exception):
     pass
 
 
+class UnbalancedLedger(Exception):
+    pass
+
+
 class LedgerEntry(NamedTuple):
     date: datetime
     dr_amount: float
     cr_amount: float
-    narration: str
+    narration: Union[str, Narration]
     balance: float
     event_id: Optional[str]
     sl_no: Optional[int]
 
 
+class JournalLedgerEntry:
+    """
+    A ledger entry which refers to its journal entry instead of copying the fields. Exposes the attributes of
+    :class:`LedgerEntry`.
+    """
+    __slots__ = ('journal_entry', 'balance', 'sl_no')
+
+    def __init__(self, journal_entry: JournalEntry, balance: float, sl_no: Optional[int]):
+        self.journal_entry = journal_entry
+        self.balance = balance
+        self.sl_no = sl_no
+
+    @property
+    def date(self) -> datetime:
+        return self.journal_entry.date
+
+    @property
+    def dr_amount(self) -> float:
+        return self.journal_entry.dr_amount
+
+    @property
+    def cr_amount(self) -> float:
+        return self.journal_entry.cr_amount
+
+    @property
+    def narration(self) -> Union[str, Narration]:
+        return self.journal_entry.narration
+
+    @property
+    def event_id(self) -> Optional[str]:
+        return self.journal_entry.event_id
+
+    def _asdict(self) -> dict:
+        return {field: getattr(self, field) for field in LedgerEntry._fields}
+
+
 class AccountLedger:
     def __init__(self, account_name: str, balance_type: BalanceType):
         self.account_name = account_name
         self.balance_type = balance_type
-        self.__entries: List[LedgerEntry] = []
+        self.__debit = balance_type == BalanceType.DEBIT
+        self.__entries: List[Union[LedgerEntry, JournalLedgerEntry]] = []
+        # Cumulative dr and cr amounts till each entry, extended on demand so adding an entry has no bookkeeping
+        self.__dr_totals = array('d')
+        self.__cr_totals = array('d')
+        # Dates and balances as arrays for get_balances, built on demand
+        self.__arrays: Optional[tuple] = None
+
+    def __next_balance(self, date: datetime, dr_amount: float, cr_amount: float) -> float:
+        entries = self.__entries
+        if entries and date < entries[-1].date:
+            raise InvalidLedgerEntry("Backdated entry can't be added")
+        balance = entries[-1].balance if entries else 0
+        balance += dr_amount - cr_amount if self.__debit else cr_amount - dr_amount
+        return balance
+
+    def __extend_totals(self):
+        dr_total = self.__dr_totals[-1] if self.__dr_totals else 0
+        cr_total = self.__cr_totals[-1] if self.__cr_totals else 0
+        for entry in self.__entries[len(self.__dr_totals):]:
+            dr_total += entry.dr_amount
+            cr_total += entry.cr_amount
+            self.__dr_totals.append(dr_total)
+            self.__cr_totals.append(cr_total)
 
     def add_entry(
             self,
             date: datetime,
             dr_amount: float,
             cr_amount: float,
-            narration: str,
+            narration: Union[str, Narration],
             event_id: Optional[str],
             sl_no: Optional[int],
     ):
-        if len(self.__entries) and date < self.__entries[-1].date:
-            raise InvalidLedgerEntry("Backdated entry can't be added")
-        balance = self.__entries[-1].balance if len(self.__entries) else 0
-        balance += dr_amount - cr_amount if self.balance_type == BalanceType.DEBIT else cr_amount - dr_amount
+        balance = self.__next_balance(date, dr_amount, cr_amount)
         self.__entries.append(
             LedgerEntry(
                 sl_no=sl_no,
@@ -51,6 +119,72 @@ class AccountLedger:
             )
         )
 
+    def add_journal_entry(self, entry: JournalEntry, sl_no: Optional[int]):
+        balance = self.__next_balance(entry.date, entry.dr_amount, entry.cr_amount)
+        self.__entries.append(JournalLedgerEntry(entry, balance, sl_no))
+
+    def count(self, as_of: datetime) -> int:
+        """
+        Number of entries dated on or before as_of
+        """
+        start, end = 0, len(self.__entries)
+        while start < end:
+            mid = (start + end) // 2
+            if self.__entries[mid].date <= as_of:
+                start = mid + 1
+            else:
+                end = mid
+        return start
+
+    def __insert(self, entry: Union[LedgerEntry, JournalLedgerEntry]):
+        position = self.count(entry.date)
+        self.__entries.insert(position, entry)
+        # Balances of the entries from the inserted one are recomputed the same way they are added
+        balance = self.__entries[position - 1].balance if position else 0
+        for idx in range(position, len(self.__entries)):
+            entry = self.__entries[idx]
+            if self.balance_type == BalanceType.DEBIT:
+                balance += entry.dr_amount - entry.cr_amount
+            else:
+                balance += entry.cr_amount - entry.dr_amount
+            if isinstance(entry, JournalLedgerEntry):
+                entry.balance = balance
+            else:
+                self.__entries[idx] = entry._replace(balance=balance)
+        self.__arrays = None
+        del self.__dr_totals[position:], self.__cr_totals[position:]
+
+    def insert_entry(
+            self,
+            date: datetime,
+            dr_amount: float,
+            cr_amount: float,
+            narration: Union[str, Narration],
+            event_id: Optional[str],
+            sl_no: Optional[int],
+    ):
+        """
+        Adds an entry which may be backdated, after the entries on or before its date, and repairs the balances
+        of the later entries
+        """
+        self.__insert(LedgerEntry(date, dr_amount, cr_amount, narration, 0, event_id, sl_no))
+
+    def insert_journal_entry(self, entry: JournalEntry, sl_no: Optional[int]):
+        self.__insert(JournalLedgerEntry(entry, 0, sl_no))
+
+    def shift_sl_nos(self, sl_no: int):
+        """
+        Increments the sl_no of the entries from sl_no, to make room for an inserted entry
+        """
+        idx = len(self.__entries) - 1
+        while idx >= 0 and self.__entries[idx].sl_no >= sl_no:
+            entry = self.__entries[idx]
+            if isinstance(entry, JournalLedgerEntry):
+                entry.sl_no += 1
+            else:
+                self.__entries[idx] = entry._replace(sl_no=entry.sl_no + 1)
+            idx -= 1
+
     def get_balance(self, as_of: Optional[datetime] = None) -> float:
         if as_of is None:
             return self.__entries[-1].balance if len(self.__entries) else 0
@@ -66,32 +200,182 @@ class AccountLedger:
                 end = mid - 1
         return balance
 
-    def get_entries(self) -> List[LedgerEntry]:
+    def get_balances(self, dates: np.ndarray) -> np.ndarray:
+        """
+        Balances as of each of the dates, same as get_balance of each date
+
+        :param dates: Sorted datetime64[us] array
+        """
+        if self.__arrays is None or len(self.__arrays[0]) != len(self.__entries):
+            self.__arrays = (
+                np.array([entry.date for entry in self.__entries], dtype='datetime64[us]'),
+                np.array([0] + [entry.balance for entry in self.__entries])
+            )
+        entry_dates, balances = self.__arrays
+        return balances[np.searchsorted(entry_dates, dates, side='right')]
+
+    def get_dr(self, as_of: Optional[datetime] = None) -> float:
+        """
+        Total dr amount of the entries, optionally of the ones on or before as_of
+        """
+        count = len(self.__entries) if as_of is None else self.count(as_of)
+        if count > len(self.__dr_totals):
+            self.__extend_totals()
+        return self.__dr_totals[count - 1] if count else 0
+
+    def get_cr(self, as_of: Optional[datetime] = None) -> float:
+        """
+        Total cr amount of the entries, optionally of the ones on or before as_of
+        """
+        count = len(self.__entries) if as_of is None else self.count(as_of)
+        if count > len(self.__cr_totals):
+            self.__extend_totals()
+        return self.__cr_totals[count - 1] if count else 0
+
+    def get_entries(self) -> List[Union[LedgerEntry, JournalLedgerEntry]]:
         return self.__entries
 
+    def get_columns(self) -> tuple:
+        """
+        Arrays of date, dr_amount, cr_amount, narration, event_id and sl_no of the entries
+        """
+        # Fields of compact entries are read from their journal entries directly rather than through properties
+        sources = [
+            entry.journal_entry if type(entry) is JournalLedgerEntry else entry for entry in self.__entries
+        ]
+        return (
+            pd.DatetimeIndex([source.date for source in sources]).values,
+            np.array([source.dr_amount for source in sources]),
+            np.array([source.cr_amount for source in sources]),
+            np.array([source.narration for source in sources], dtype=object),
+            np.array([source.event_id for source in sources], dtype=object),
+            np.array([entry.sl_no for entry in self.__entries], dtype=np.int64)
+        )
+
+
+# Ledgers kept in sync with a journal, by config id, key and compact
+class AccountTypeLedger:
+    """
+    Balance of the accounts of an account type. The net dr amount of the type is maintained by the ledger on every
+    entry, which gives the current balance. The balances by date are merged from the account ledgers (in sl_no
+    order) when first asked as of a date and extended with the entries added since on later asks, so adding an
+    entry keeps no history.
+    """
+    def __init__(self, balance_type: BalanceType, ledgers: List[AccountLedger]):
+        self.balance_type = balance_type
+        self.ledgers = ledgers
+        # Total dr less total cr of the accounts of the type
+        self.net_dr: float = 0
+        self.__dates: List[datetime] = []
+        self.__balances = array('d')
+        # Number of the entries of each account ledger merged into the balances by date
+        self.__counts = [0] * len(ledgers)
+
+    def reset(self):
+        """
+        Drops the balances by date, e.g. after a backdated entry is inserted
+        """
+        self.__dates, self.__balances, self.__counts = [], array('d'), [0] * len(self.ledgers)
+
+    def __extend(self):
+        entries = [ledger.get_entries() for ledger in self.ledgers]
+        balance = self.__balances[-1] if self.__balances else 0
+        for entry in heapq.merge(*[
+            entries[idx][count:] for idx, count in enumerate(self.__counts) if count < len(entries[idx])
+        ], key=lambda e: e.sl_no):
+            if self.balance_type is BalanceType.DEBIT:
+                balance += entry.dr_amount - entry.cr_amount
+            else:
+                balance += entry.cr_amount - entry.dr_amount
+            self.__dates.append(entry.date)
+            self.__balances.append(balance)
+        self.__counts = [len(account_entries) for account_entries in entries]
+
+    def get_balance(self, as_of: Optional[datetime] = None) -> float:
+        if as_of is None:
+            return self.net_dr if self.balance_type is BalanceType.DEBIT else -self.net_dr
+        self.__extend()
+        count = bisect_right(self.__dates, as_of)
+        return self.__balances[count - 1] if count else 0
+
+
+_attached: 'WeakKeyDictionary[Journal, Dict[tuple, Ledger]]' = WeakKeyDictionary()
+
 
 class Ledger:
-    def __init__(self, journal: Journal, config: dict, key: str = ""):
+    def __init__(self, journal: Journal, config: dict, key: str = "", compact: bool = False):
+        # Version and number of entries of the journal the ledger is in sync with
+        self.journal_version: int = journal.version
+        self.journal_size: int = len(journal.entries)
         self.config = config
         self.key = key
+        # Compact ledgers keep JournalLedgerEntry referring to the journal entries
+        self.compact = compact
+        # Amounts are kept as integer minor units when the config sets minor_units. Amounts passed to add_entry
+        # and insert_entry, and the amounts returned, are converted
+        self.minor_units: Optional[int] = get_minor_units(config)
+        self.chart = ChartOfAccounts(config)
         self.ledgers: Dict[str, AccountLedger] = {
-            account: AccountLedger(
-                account_name=account_config.get('name', account),
-                balance_type=BalanceType[config['account_types'][account_config['type']]['balance_type']]
+            account: AccountLedger(account_name=self.chart.names[account], balance_type=balance_type)
+            for account, balance_type in self.chart.balance_types.items()
+        }
+        # Balances by account type, maintained along with the account ledgers
+        self.type_ledgers: Dict[str, AccountTypeLedger] = {
+            account_type: AccountTypeLedger(
+                balance_type, [self.ledgers[account] for account in self.chart.type_accounts[account_type]]
             )
-            for account, account_config in config['accounts'].items()
+            for account_type, balance_type in self.chart.type_balance_types.items()
+        }
+        self.__account_type_ledgers: Dict[str, AccountTypeLedger] = {
+            account: self.type_ledgers[account_type] for account, account_type in self.chart.types.items()
         }
         self.__sl_no: int = 0
+        # Running dr and cr totals of all the entries, for check_trial_balance
+        self.total_dr: float = 0
+        self.total_cr: float = 0
+        self.__balances: Dict[str, float] = {}
         for je in journal.entries:
-            self.ledgers[je.account].add_entry(
-                date=je.date,
-                dr_amount=je.dr_amount,
-                cr_amount=je.cr_amount,
-                narration=je.narration,
-                event_id=je.event_id,
-                sl_no=self.__sl_no
-            )
-            self.__sl_no += 1
+            self.add_journal_entry(je)
+
+    @classmethod
+    def for_journal(cls, journal: Journal, config: dict, key: str = "", compact: bool = False) -> 'Ledger':
+        """
+        The ledger attached to the journal for the config, key and compact, built once and then kept up to date
+        with the entries added to the journal since. It is built again if the journal was rewritten (backdated
+        insertion, compaction). Changes to the journal must be made through its methods.
+        """
+        ledgers = _attached.setdefault(journal, {})
+        ledger = ledgers.get((id(config), key, compact))
+        if ledger is None or ledger.config is not config or journal.rewrite_version > ledger.journal_version:
+            ledger = cls(journal, config, key, compact)
+            ledger.attach(journal)
+            return ledger
+        if journal.version != ledger.journal_version:
+            for entry in journal.entries[ledger.journal_size:]:
+                ledger.add_journal_entry(entry)
+            ledger.synced(journal)
+        return ledger
+
+    def attach(self, journal: Journal):
+        """
+        Attaches the ledger to the journal, to be returned by :meth:`for_journal`. The ledger is assumed to be in
+        sync with the journal
+        """
+        self.synced(journal)
+        _attached.setdefault(journal, {})[(id(self.config), self.key, self.compact)] = self
+
+    def __to_minor(self, amount: float) -> Union[int, float]:
+        return amount if self.minor_units is None else to_minor(amount, self.minor_units)
+
+    def __to_major(self, value: float) -> float:
+        return value if self.minor_units is None else to_major(value, self.minor_units)
+
+    def synced(self, journal: Journal):
+        """
+        Marks the ledger in sync with the current version of the journal
+        """
+        self.journal_version = journal.version
+        self.journal_size = len(journal.entries)
 
     def add_entry(
             self,
@@ -99,9 +383,13 @@ class Ledger:
             cr_account: str,
             amount: float,
             date: datetime,
-            narration: str,
+            narration: Union[str, Narration],
             event_id: Optional[str] = None
     ):
+        if self.minor_units is not None:
+            amount = to_minor(amount, self.minor_units)
+        self.__balances.pop(dr_account, None)
+        self.__balances.pop(cr_account, None)
         self.ledgers[dr_account].add_entry(
             date=date,
             dr_amount=amount,
@@ -110,6 +398,8 @@ class Ledger:
             event_id=event_id,
             sl_no=self.__sl_no
         )
+        self.__account_type_ledgers[dr_account].net_dr += amount
+        self.total_dr += amount
         self.__sl_no += 1
         self.ledgers[cr_account].add_entry(
             date=date,
@@ -119,57 +409,223 @@ class Ledger:
             event_id=event_id,
             sl_no=self.__sl_no
         )
+        self.__account_type_ledgers[cr_account].net_dr -= amount
+        self.total_cr += amount
+        self.__sl_no += 1
+
+    def add_journal_entry(self, entry: JournalEntry):
+        self.__balances.pop(entry.account, None)
+        if self.compact:
+            self.ledgers[entry.account].add_journal_entry(entry, self.__sl_no)
+        else:
+            self.ledgers[entry.account].add_entry(
+                date=entry.date,
+                dr_amount=entry.dr_amount,
+                cr_amount=entry.cr_amount,
+                narration=entry.narration,
+                event_id=entry.event_id,
+                sl_no=self.__sl_no
+            )
+        self.__account_type_ledgers[entry.account].net_dr += entry.dr_amount - entry.cr_amount
+        self.total_dr += entry.dr_amount
+        self.total_cr += entry.cr_amount
+        self.__sl_no += 1
+
+    def __insert_sl_no(self, date: datetime) -> int:
+        sl_no = sum([ledger.count(date) for ledger in self.ledgers.values()])
+        for ledger in self.ledgers.values():
+            ledger.shift_sl_nos(sl_no)
+        for type_ledger in self.type_ledgers.values():
+            type_ledger.reset()
         self.__sl_no += 1
+        return sl_no
+
+    def insert_entry(
+            self,
+            dr_account: str,
+            cr_account: str,
+            amount: float,
+            date: datetime,
+            narration: Union[str, Narration],
+            event_id: Optional[str] = None
+    ):
+        """
+        Adds an entry which may be backdated. The entries are placed after the entries on or before the date, the
+        balances of the later entries of the two accounts are repaired and the sl_no of the later entries are
+        shifted, so the ledger is the same as the one built from the journal with the entry inserted.
+        """
+        amount = self.__to_minor(amount)
+        self.__balances.pop(dr_account, None)
+        self.__balances.pop(cr_account, None)
+        self.ledgers[dr_account].insert_entry(date, amount, 0, narration, event_id, self.__insert_sl_no(date))
+        self.__account_type_ledgers[dr_account].net_dr += amount
+        self.total_dr += amount
+        self.ledgers[cr_account].insert_entry(date, 0, amount, narration, event_id, self.__insert_sl_no(date))
+        self.__account_type_ledgers[cr_account].net_dr -= amount
+        self.total_cr += amount
+
+    def insert_journal_entry(self, entry: JournalEntry):
+        self.__balances.pop(entry.account, None)
+        self.ledgers[entry.account].insert_journal_entry(entry, self.__insert_sl_no(entry.date))
+        self.__account_type_ledgers[entry.account].net_dr += entry.dr_amount - entry.cr_amount
+        self.total_dr += entry.dr_amount
+        self.total_cr += entry.cr_amount
+
+    def check_trial_balance(self, tolerance: float = TOLERANCE_FLOATING, rel_tol: float = 1e-12) -> bool:
+        """
+        Checks, in O(accounts), that the total dr equals the total cr, that the account ledgers add up to the
+        totals, and that the balances of the debit accounts equal the balances of the credit accounts.
+        Fractional amounts are compared with a tolerance scaled to their size (see :func:`math.isclose`), amounts
+        in minor units are checked exactly.
+
+        :param tolerance: Allowed absolute difference for fractional amounts
+        :param rel_tol: Allowed difference for fractional amounts relative to the larger of the two
+        :raises: UnbalancedLedger
+        """
+        if self.minor_units is not None:
+            tolerance, rel_tol = 0, 0
+        account_dr = sum([ledger.get_dr() for ledger in self.ledgers.values()])
+        account_cr = sum([ledger.get_cr() for ledger in self.ledgers.values()])
+        checks = [
+            ('total dr and total cr', self.total_dr, self.total_cr),
+            ('account dr totals and total dr', account_dr, self.total_dr),
+            ('account cr totals and total cr', account_cr, self.total_cr),
+            (
+                'debit and credit account type balances',
+                sum([
+                    ledger.get_balance() for ledger in self.ledgers.values()
+                    if ledger.balance_type == BalanceType.DEBIT
+                ]),
+                sum([
+                    ledger.get_balance() for ledger in self.ledgers.values()
+                    if ledger.balance_type == BalanceType.CREDIT
+                ])
+            )
+        ]
+        for name, left, right in checks:
+            if not math.isclose(left, right, rel_tol=rel_tol, abs_tol=tolerance):
+                raise UnbalancedLedger(f'Ledger {self.key} is not balanced, {name} differ: {left} != {right}')
+        return True
 
     def get_account_dr(self, account: str, as_of: Optional[datetime] = None) -> float:
         assert self.config['accounts'][account]['type'] in self.config['account_types'], f'Invalid account {account}'
-        if as_of is not None:
-            return sum([entry.dr_amount for entry in self.ledgers[account].get_entries() if entry.date <= as_of])
-        return sum([entry.dr_amount for entry in self.ledgers[account].get_entries()])
+        return self.__to_major(self.ledgers[account].get_dr(as_of))
 
     def get_account_cr(self, account: str, as_of: Optional[datetime] = None) -> float:
         assert self.config['accounts'][account]['type'] in self.config['account_types'], f'Invalid account {account}'
-        if as_of is not None:
-            return sum([entry.cr_amount for entry in self.ledgers[account].get_entries() if entry.date <= as_of])
-        return sum([entry.cr_amount for entry in self.ledgers[account].get_entries()])
+        return self.__to_major(self.ledgers[account].get_cr(as_of))
 
     def get_account_balance(self, account: str, as_of: Optional[datetime] = None) -> float:
         assert self.config['accounts'][account]['type'] in self.config['account_types'], f'Invalid account {account}'
-        return self.ledgers[account].get_balance(as_of)
+        # Current balances are memoized until add_entry touches the account
+        if as_of is None and account in self.__balances:
+            return self.__balances[account]
+        balance = self.__to_major(self.ledgers[account].get_balance(as_of))
+        if as_of is None:
+            self.__balances[account] = balance
+        return balance
 
     def get_balances(self, as_of: Optional[datetime] = None) -> Dict[str, float]:
-        return {account: ledger.get_balance(as_of) for account, ledger in self.ledgers.items()}
+        return {account: self.__to_major(ledger.get_balance(as_of)) for account, ledger in self.ledgers.items()}
 
-    def get_ledger(self) -> List[dict]:
-        return sorted(
-            [
-                {**entry._asdict(), 'account': account, 'key': self.key}
-                for account, ledger in self.ledgers.items()
-                for entry in ledger.get_entries()
-            ],
+    def iter_ledger(self) -> Iterator[dict]:
+        """
+        Rows of :meth:`get_ledger` one at a time, merging the account ledgers (each ordered by sl_no) lazily
+        """
+        return heapq.merge(
+            *[self.__iter_account_ledger(account) for account in self.ledgers.keys()],
             key=lambda x: x['sl_no']
         )
 
+    def __iter_account_ledger(self, account: str) -> Iterator[dict]:
+        for entry in self.ledgers[account].get_entries():
+            row = {**entry._asdict(), 'narration': str(entry.narration), 'account': account, 'key': self.key}
+            if self.minor_units is not None:
+                for field in ['dr_amount', 'cr_amount', 'balance']:
+                    row[field] = to_major(row[field], self.minor_units)
+            yield row
+
+    def get_balance_series(
+            self,
+            dates: Optional[Iterable[datetime]] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            freq: str = 'D'
+    ) -> pd.DataFrame:
+        """
+        Balances of all the accounts as of each of the dates, with a row per account and a column per date
+
+        :param dates: Sorted dates, or
+        :param start: Start of the date range
+        :param end: End of the date range (inclusive)
+        :param freq: Frequency of the date range, as in :func:`pandas.date_range`
+        """
+        dates = pd.DatetimeIndex(dates if dates is not None else pd.date_range(start, end, freq=freq))
+        values = dates.values.astype('datetime64[us]')
+        return pd.DataFrame(
+            [self.__to_major(ledger.get_balances(values)) for ledger in self.ledgers.values()],
+            index=list(self.ledgers.keys()),
+            columns=dates
+        )
+
+    def get_ledger(self) -> List[dict]:
+        return list(self.iter_ledger())
+
     def get_df(self) -> pd.DataFrame:
-        ledger_df = pd.DataFrame(self.get_ledger())
-        if not ledger_df.empty:
-            ledger_df.drop(columns=['balance'], inplace=True)
-            ledger_df['account_name'] = ledger_df['account'].apply(lambda x: self.config['accounts'][x].get('name', x))
+        """
+        The ledger (without balances) as a dataframe ordered by sl_no, with account_name as a categorical
+        """
+        # Columns are built per account ledger, concatenated and put in sl_no order with a single argsort
+        fields = ['date', 'dr_amount', 'cr_amount', 'narration', 'event_id', 'sl_no']
+        codes = [code for code, ledger in enumerate(self.ledgers.values()) if ledger.get_entries()]
+        if not codes:
+            return pd.DataFrame()
+        ledgers = list(self.ledgers.values())
+        account_columns = [ledgers[code].get_columns() for code in codes]
+        counts = [len(columns[-1]) for columns in account_columns]
+        columns = {
+            field: np.concatenate([account[idx] for account in account_columns])
+            for idx, field in enumerate(fields)
+        }
+        order = np.argsort(columns['sl_no'], kind='stable')
+        ledger_df = pd.DataFrame({field: columns[field][order] for field in fields})
+        if self.minor_units is not None:
+            ledger_df['dr_amount'] = ledger_df['dr_amount'] / self.minor_units
+            ledger_df['cr_amount'] = ledger_df['cr_amount'] / self.minor_units
+        ledger_df['narration'] = ledger_df['narration'].astype(str)
+        account_codes = np.repeat(codes, counts)[order]
+        accounts = list(self.ledgers.keys())
+        ledger_df['account'] = np.array(accounts, dtype=object)[account_codes]
+        ledger_df['key'] = self.key
+        names = [self.chart.names[account] for account in accounts]
+        categories = list(dict.fromkeys(names))
+        name_codes = np.array([categories.index(name) for name in names])
+        ledger_df['account_name'] = pd.Categorical.from_codes(name_codes[account_codes], categories=categories)
         return ledger_df
 
     def add_account_balance(self, account: str, df: pd.DataFrame):
         return add_account_balance(self.config, df, account)
 
     def get_balance_sheet(self):
-        df = self.get_df()
-        for acct_name in self.config['accounts'].keys():
-            df = self.add_account_balance(acct_name, df)
-        return df
+        return add_account_balances(self.config, self.get_df())
 
-    def get_account_type_balance(self, account_type: str, exclude_accounts: List[str] = None):
-        balance = 0
-        exclude_accounts = [] if exclude_accounts is None else exclude_accounts
-        for account_name, account in self.config['accounts'].items():
-            if account['type'] == account_type and account_name not in exclude_accounts:
-                balance += self.get_account_balance(account_name)
-        return balance
+    def get_account_type_balance(
+            self,
+            account_type: str,
+            exclude_accounts: List[str] = None,
+            as_of: Optional[datetime] = None
+    ) -> float:
+        """
+        Balance of the account type, less the balances of the excluded accounts of the type. The balance of the
+        type is maintained on every entry, so this is O(1) (O(log n) with as_of) plus O(1) (O(log n)) per excluded
+        account. Fractional amounts are summed in entry order and may differ in the last digits from the sum of
+        the account balances.
+        """
+        type_ledger = self.type_ledgers.get(account_type)
+        if type_ledger is None:
+            return 0
+        balance = type_ledger.get_balance(as_of)
+        for account in set(exclude_accounts or []):
+            if self.chart.types.get(account) == account_type:
+                balance -= self.ledgers[account].get_balance(as_of)
+        return self.__to_major(balance)
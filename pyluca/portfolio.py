@@ -0,0 +1,227 @@
+import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from pyluca.account_config import BalanceType, ChartOfAccounts
+from pyluca.amounts import get_minor_units
+from pyluca.columnar_journal import _Dictionary, to_epoch
+from pyluca.journal import JournalEntry
+from pyluca.ledger import Ledger
+
+
+class PortfolioLedger:
+    """
+    Balances of many keyed ledgers kept in shared numpy columns (key, account, date and the signed amount of each
+    entry), answering balance queries across keys with vectorized reductions. Keys can be added and removed;
+    rows of removed keys are dropped once they outnumber the live rows.
+
+    With ``minor_units`` in the config the amounts are taken as minor units (as in the journal) and balances are
+    returned in major units.
+
+    :param config: Accounting config of all the keys
+    :param capacity: Initial capacity (entries) of the columns
+    """
+    def __init__(self, config: dict, capacity: int = 1024):
+        self.config = config
+        self.chart = ChartOfAccounts(config)
+        self.minor_units: Optional[int] = get_minor_units(config)
+        self.accounts: List[str] = list(self.chart.types.keys())
+        self.__account_codes: Dict[str, int] = {account: code for code, account in enumerate(self.accounts)}
+        self.__signs = np.array([
+            1 if self.chart.balance_types[account] == BalanceType.DEBIT else -1 for account in self.accounts
+        ])
+        self.keys = _Dictionary()
+        # Whether each key code is live and its number of rows, with room for more keys
+        self.__live = np.zeros(16, dtype=bool)
+        self.__key_rows = np.zeros(16, dtype=np.int64)
+        self.__size = 0
+        self.__dead = 0
+        self.key_codes = np.empty(capacity, dtype=np.int32)
+        self.account_codes = np.empty(capacity, dtype=np.int32)
+        self.dates = np.empty(capacity, dtype=np.int64)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.__size - self.__dead
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys.codes and self.__live[self.keys.codes[key]]
+
+    def get_keys(self) -> List[str]:
+        return [key for key, code in self.keys.codes.items() if self.__live[code]]
+
+    def __grow(self, size: int):
+        capacity = max(2 * len(self.key_codes), size)
+        for column in ['key_codes', 'account_codes', 'dates', 'amounts']:
+            array = getattr(self, column)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.__size] = array[:self.__size]
+            setattr(self, column, grown)
+
+    def __grow_keys(self):
+        capacity = 2 * len(self.__live)
+        live, key_rows = np.zeros(capacity, dtype=bool), np.zeros(capacity, dtype=np.int64)
+        live[:len(self.__live)] = self.__live
+        key_rows[:len(self.__key_rows)] = self.__key_rows
+        self.__live, self.__key_rows = live, key_rows
+
+    def add_entries(self, key: str, entries: Iterable[JournalEntry]):
+        """
+        Adds journal entries (or ledger entries of an account, with ``account`` set) of the key
+
+        :param key: Key of the entries
+        :param entries: Entries with account, dr_amount, cr_amount and date
+        """
+        rows = [(entry.account, entry.date, entry.dr_amount, entry.cr_amount) for entry in entries]
+        if key in self.keys.codes and not self.__live[self.keys.codes[key]]:
+            # A removed key is added again under a new code, the rows of the old code stay dropped
+            del self.keys.codes[key]
+        code = self.keys.encode(key)
+        if code == len(self.__live):
+            self.__grow_keys()
+        self.__live[code] = True
+        if not rows:
+            return
+        self.__key_rows[code] += len(rows)
+        size = self.__size + len(rows)
+        if size > len(self.key_codes):
+            self.__grow(size)
+        accounts, dates, dr_amounts, cr_amounts = zip(*rows)
+        account_codes = np.array([self.__account_codes[account] for account in accounts], dtype=np.int32)
+        self.key_codes[self.__size:size] = code
+        self.account_codes[self.__size:size] = account_codes
+        self.dates[self.__size:size] = [to_epoch(date) for date in dates]
+        self.amounts[self.__size:size] = self.__signs[account_codes] * (
+            np.array(dr_amounts, dtype=np.float64) - np.array(cr_amounts, dtype=np.float64)
+        )
+        self.__size = size
+
+    def add_ledger(self, ledger: Ledger):
+        """
+        Adds the entries of the ledger under its key
+        """
+        self.add_entries(ledger.key, [
+            _AccountEntry(account, entry)
+            for account, account_ledger in ledger.ledgers.items()
+            for entry in account_ledger.get_entries()
+        ])
+
+    def remove_key(self, key: str):
+        """
+        Removes the entries of the key
+        """
+        if key not in self:
+            raise KeyError(key)
+        code = self.keys.codes[key]
+        self.__live[code] = False
+        self.__dead += int(self.__key_rows[code])
+        if self.__dead > self.__size - self.__dead:
+            self.__compact()
+
+    def __compact(self):
+        keep = self.__live[self.key_codes[:self.__size]]
+        for column in ['key_codes', 'account_codes', 'dates', 'amounts']:
+            array = getattr(self, column)
+            kept = array[:self.__size][keep]
+            array[:len(kept)] = kept
+        self.__size, self.__dead = int(np.count_nonzero(keep)), 0
+        keys = self.keys
+        self.keys = _Dictionary()
+        codes = np.full(len(keys.values), -1, dtype=np.int32)
+        for code, key in enumerate(keys.values):
+            if self.__live[code]:
+                codes[code] = self.keys.encode(key)
+        self.key_codes[:self.__size] = codes[self.key_codes[:self.__size]]
+        kept = codes >= 0
+        count = len(self.keys.values)
+        self.__key_rows[:count] = self.__key_rows[:len(codes)][kept]
+        self.__key_rows[count:] = 0
+        self.__live[:count] = True
+        self.__live[count:] = False
+
+    def __mask(self, as_of: Optional[datetime.datetime], keys: Optional[Iterable[str]]) -> np.ndarray:
+        key_codes = self.key_codes[:self.__size]
+        live = self.__live
+        if keys is not None:
+            live = np.zeros(len(self.__live), dtype=bool)
+            live[[self.keys.codes[key] for key in keys if key in self]] = True
+        mask = live[key_codes]
+        if as_of is not None:
+            mask &= self.dates[:self.__size] <= to_epoch(as_of)
+        return mask
+
+    def __to_major(self, values: np.ndarray) -> np.ndarray:
+        return values if self.minor_units is None else values / self.minor_units
+
+    def get_balances(
+            self,
+            as_of: Optional[datetime.datetime] = None,
+            keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, float]:
+        """
+        Balance of each account summed over the keys
+
+        :param as_of: Optional date of the balances
+        :param keys: Optional subset of the keys
+        """
+        mask = self.__mask(as_of, keys)
+        balances = np.bincount(
+            self.account_codes[:self.__size][mask], weights=self.amounts[:self.__size][mask],
+            minlength=len(self.accounts)
+        )
+        return dict(zip(self.accounts, self.__to_major(balances).tolist()))
+
+    def get_account_balance(
+            self,
+            account: str,
+            as_of: Optional[datetime.datetime] = None,
+            keys: Optional[Iterable[str]] = None
+    ) -> float:
+        mask = self.__mask(as_of, keys) & (self.account_codes[:self.__size] == self.__account_codes[account])
+        return float(self.__to_major(self.amounts[:self.__size][mask].sum()))
+
+    def get_account_type_balance(
+            self,
+            account_type: str,
+            as_of: Optional[datetime.datetime] = None,
+            keys: Optional[Iterable[str]] = None,
+            exclude_accounts: List[str] = None
+    ) -> float:
+        exclude_accounts = [] if exclude_accounts is None else exclude_accounts
+        balances = self.get_balances(as_of, keys)
+        return sum([
+            balances[account] for account in self.chart.type_accounts[account_type] if account not in exclude_accounts
+        ])
+
+    def get_key_balances(
+            self,
+            account: str,
+            as_of: Optional[datetime.datetime] = None,
+            keys: Optional[Iterable[str]] = None
+    ) -> pd.Series:
+        """
+        Balance of the account of each key
+
+        :param account: The account
+        :param as_of: Optional date of the balances
+        :param keys: Optional subset of the keys
+        """
+        mask = self.__mask(as_of, keys) & (self.account_codes[:self.__size] == self.__account_codes[account])
+        balances = np.bincount(
+            self.key_codes[:self.__size][mask], weights=self.amounts[:self.__size][mask],
+            minlength=len(self.keys.values)
+        )
+        selected = self.__live[:len(self.keys.values)].copy()
+        if keys is not None:
+            selected &= np.isin(np.array(self.keys.values, dtype=object), list(keys))
+        return pd.Series(self.__to_major(balances)[selected], index=np.array(self.keys.values, dtype=object)[selected])
+
+
+class _AccountEntry:
+    __slots__ = ('account', 'date', 'dr_amount', 'cr_amount')
+
+    def __init__(self, account: str, entry):
+        self.account = account
+        self.date = entry.date
+        self.dr_amount = entry.dr_amount
+        self.cr_amount = entry.cr_amount
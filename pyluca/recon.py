@@ -7,12 +7,12 @@ from pyluca.ledger import Ledger
 
 def _is_matching(config: dict, journal_1: Journal, journal_2: Journal) -> bool:
     for acct_name in config['accounts'].keys():
-        if Ledger(journal_1, config).get_account_balance(acct_name) \
-                != Ledger(journal_2, config).get_account_balance(acct_name):
+        if Ledger.for_journal(journal_1, config).get_account_balance(acct_name) \
+                != Ledger.for_journal(journal_2, config).get_account_balance(acct_name):
             return False
-    if Ledger(journal_1, config).get_account_balance('RECONCILE_CONTROL') != 0:
+    if Ledger.for_journal(journal_1, config).get_account_balance('RECONCILE_CONTROL') != 0:
         return False
-    if Ledger(journal_2, config).get_account_balance('RECONCILE_CONTROL') != 0:
+    if Ledger.for_journal(journal_2, config).get_account_balance('RECONCILE_CONTROL') != 0:
         return False
     return True
 
@@ -25,8 +25,8 @@ def reconcile_ledger(
 ):
     assert _is_matching(config, closed_accountant.journal, current_accountant.journal) is False
     for acct_name in [a for a in config['accounts'].keys() if a not in ['RECONCILE_CONTROL']]:
-        diff = Ledger(current_accountant.journal, config).get_account_balance(acct_name) \
-               - Ledger(closed_accountant.journal, config).get_account_balance(acct_name)
+        diff = Ledger.for_journal(current_accountant.journal, config).get_account_balance(acct_name) \
+               - Ledger.for_journal(closed_accountant.journal, config).get_account_balance(acct_name)
         if diff == 0:
             continue
         if config['account_types'][config['accounts'][acct_name]['type']]['balance_type'] == BalanceType.DEBIT.value:
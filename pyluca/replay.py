@@ -0,0 +1,102 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Tuple, List, Optional, Dict, NamedTuple, Iterator
+from pyluca.accountant import Accountant
+from pyluca.action import compile_actions, apply_many
+from pyluca.event import Event
+from pyluca.journal import Journal, JournalEntry
+
+
+class ReplayResult(NamedTuple):
+    key: str
+    journal: Optional[Journal]
+    balances: Dict[str, float]
+
+
+_worker_state: dict = {}
+
+
+def _init_worker(config: dict, context: Optional[dict], external_actions: Optional[dict]):
+    _worker_state['config'] = config
+    _worker_state['plan'] = compile_actions(config)
+    _worker_state['context'] = context
+    _worker_state['external_actions'] = external_actions
+
+
+def _replay_chunk(chunk: List[Tuple[str, List[Event]]], with_journal: bool) -> List[tuple]:
+    results = []
+    for key, events in chunk:
+        accountant = Accountant(Journal(), _worker_state['config'], key)
+        apply_many(
+            events,
+            accountant,
+            _worker_state['context'],
+            _worker_state['external_actions'],
+            _worker_state['plan']
+        )
+        # Plain tuples pickle much smaller than JournalEntry objects
+        rows = [
+            (je.sl_no, je.account, je.dr_amount, je.cr_amount, je.date, je.narration, je.key, je.event_id)
+            for je in accountant.journal.entries
+        ] if with_journal else None
+        results.append((key, rows, accountant.ledger.get_balances()))
+    return results
+
+
+def _chunks(groups: Iterable[Tuple[str, List[Event]]], chunk_size: int) -> Iterator[list]:
+    groups = iter(groups)
+    chunk = list(islice(groups, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(groups, chunk_size))
+
+
+def replay(
+        groups: Iterable[Tuple[str, Iterable[Event]]],
+        config: dict,
+        context: dict = None,
+        external_actions: dict = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 100,
+        with_journal: bool = True
+) -> Iterator[ReplayResult]:
+    """
+    Replays independent keyed journals in parallel. Each ``(key, events)`` group is applied on a fresh
+    :class:`~pyluca.accountant.Accountant` in a worker process; groups are shipped to the workers in chunks and
+    results are yielded in the same order as the groups.
+
+    Events and external action handlers must be picklable (module level classes and functions).
+
+    :param groups: Iterable of ``(key, events)``, events of each key ordered by date
+    :param config: Accounting config containing ``actions_config``
+    :param context: Optional context passed to every event
+    :param external_actions: Optional external action handlers
+    :param max_workers: Number of worker processes, defaults to the number of cpus
+    :param chunk_size: Number of keys sent to a worker at once
+    :param with_journal: Whether to send back the journal or only the balances of each key
+    :return: Iterator of ReplayResult
+    """
+    max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+    max_in_flight = 2 * max_workers
+    with ProcessPoolExecutor(
+            max_workers, initializer=_init_worker, initargs=(config, context, external_actions)
+    ) as executor:
+        futures = deque()
+        for chunk in _chunks(((key, list(events)) for key, events in groups), chunk_size):
+            futures.append(executor.submit(_replay_chunk, chunk, with_journal))
+            if len(futures) < max_in_flight:
+                continue
+            yield from _results(futures.popleft().result())
+        while futures:
+            yield from _results(futures.popleft().result())
+
+
+def _results(results: List[tuple]) -> Iterator[ReplayResult]:
+    for key, rows, balances in results:
+        yield ReplayResult(
+            key,
+            Journal([JournalEntry(*row) for row in rows]) if rows is not None else None,
+            balances
+        )
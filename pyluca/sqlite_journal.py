@@ -0,0 +1,206 @@
+import datetime
+import sqlite3
+from typing import Dict, List, Optional, Union
+from pyluca.columnar_journal import from_epoch, to_epoch
+from pyluca.journal import Journal, JournalEntry
+
+_connections: Dict[str, sqlite3.Connection] = {}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Connection to the database file, shared by the journals opened with the same path
+    """
+    if path not in _connections:
+        _connections[path] = sqlite3.connect(path)
+    return _connections[path]
+
+
+def disconnect(path: str):
+    """
+    Closes the shared connection to the database file, if open
+    """
+    connection = _connections.pop(path, None)
+    if connection is not None:
+        connection.close()
+
+
+class SQLiteJournal(Journal):
+    """
+    A journal of a key persisted in a SQLite table. The entries (of the optional date range) are loaded on first
+    access, and added entries are written in batches of ``batch_size`` in a single transaction; call
+    :meth:`flush` to write the rest. Journals of many keys can share a database and its connection.
+
+    Dates are stored as microseconds since epoch (see :func:`~pyluca.columnar_journal.to_epoch`) and narrations as
+    their string form.
+
+    A journal opened with a start date is seeded with an opening entry per account (narration ``Opening balance``)
+    carrying the dr and cr totals of the account before start and dated its last entry before start, so a ledger
+    over the journal has the balances of the whole key. The opening entries are not written.
+
+    As in :class:`~pyluca.journal.Journal`, the sl_no of the loaded entries are their positions in the journal. The
+    sl_no written to the table for an added entry follows the last sl_no of the key in the table, so a journal of
+    a date range numbers its entries the same way as one of the whole key. Backdated entries are not supported.
+
+    :param database: Path of the database file or a connection
+    :param key: Key of the journal
+    :param start: Optional start date (inclusive) of the entries to load
+    :param end: Optional end date (inclusive) of the entries to load. Entries are still added to the key
+    :param batch_size: Number of added entries written at once
+    :param table: Name of the table
+    :param allow_backdated: Not supported, raises if set
+    :raises: ValueError
+    """
+    def __init__(
+            self,
+            database: Union[str, sqlite3.Connection],
+            key: str,
+            start: Optional[datetime.datetime] = None,
+            end: Optional[datetime.datetime] = None,
+            batch_size: int = 1000,
+            table: str = 'journal_entries',
+            allow_backdated: bool = False
+    ):
+        if allow_backdated:
+            raise ValueError('SQLiteJournal does not support backdated entries')
+        self.connection = connect(database) if isinstance(database, str) else database
+        self.key = key
+        self.start = start
+        self.end = end
+        self.batch_size = batch_size
+        self.table = table
+        self.__entries: Optional[List[JournalEntry]] = None
+        self.__pending: List[JournalEntry] = []
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, key TEXT NOT NULL, sl_no INTEGER, '
+                f'account TEXT, dr_amount REAL, cr_amount REAL, date INTEGER, narration TEXT, event_id TEXT)'
+            )
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS {table}_key_date ON {table} (key, date)')
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table}_openings (key TEXT PRIMARY KEY, opening_count INTEGER, '
+                f'closed_till INTEGER)'
+            )
+        max_date, max_sl_no = self.connection.execute(
+            f'SELECT MAX(date), MAX(sl_no) FROM {table} WHERE key = ?', (key,)
+        ).fetchone()
+        self.max_date: Optional[datetime.datetime] = from_epoch(max_date) if max_date is not None else None
+        self.__table_sl_no: int = max_sl_no + 1 if max_sl_no is not None else 0
+        # Difference between the sl_no written to the table and the sl_no (position) of an added entry
+        self.__sl_no_offset = 0
+        compaction = self.connection.execute(
+            f'SELECT opening_count, closed_till FROM {table}_openings WHERE key = ?', (key,)
+        ).fetchone()
+        if compaction is not None:
+            self.opening_count, self.closed_till = compaction[0], from_epoch(compaction[1])
+
+    @property
+    def entries(self) -> List[JournalEntry]:
+        if self.__entries is None:
+            self.__entries = self.__load()
+        return self.__entries
+
+    @entries.setter
+    def entries(self, entries: List[JournalEntry]):
+        self.__entries = entries
+
+    def __load(self) -> List[JournalEntry]:
+        query = f'SELECT sl_no, account, dr_amount, cr_amount, date, narration, event_id FROM {self.table} ' \
+                f'WHERE key = ?'
+        params = [self.key]
+        if self.start is not None:
+            query += ' AND date >= ?'
+            params.append(to_epoch(self.start))
+        if self.end is not None:
+            query += ' AND date <= ?'
+            params.append(to_epoch(self.end))
+        entries = self.__openings() + [
+            JournalEntry(sl_no, account, dr_amount, cr_amount, from_epoch(date), narration, self.key, event_id)
+            for sl_no, account, dr_amount, cr_amount, date, narration, event_id
+            in self.connection.execute(f'{query} ORDER BY id', params)
+        ]
+        for position, entry in enumerate(entries):
+            entry.sl_no = position
+        self.__sl_no_offset = self.__table_sl_no - len(entries)
+        return entries
+
+    def __openings(self) -> List[JournalEntry]:
+        if self.start is None:
+            return []
+        return [
+            JournalEntry(-1, account, dr_amount, cr_amount, from_epoch(date), 'Opening balance', self.key, None)
+            for account, dr_amount, cr_amount, date in self.connection.execute(
+                f'SELECT account, SUM(dr_amount), SUM(cr_amount), MAX(date) FROM {self.table} '
+                f'WHERE key = ? AND date < ? GROUP BY account ORDER BY MAX(date), account',
+                (self.key, to_epoch(self.start))
+            )
+        ]
+
+    def add_entry(self, entry: JournalEntry):
+        super(SQLiteJournal, self).add_entry(entry)
+        self.__pending.append(entry)
+        if len(self.__pending) >= self.batch_size:
+            self.flush()
+
+    def add_entries(self, entries: List[JournalEntry]):
+        super(SQLiteJournal, self).add_entries(entries)
+        self.__pending.extend(entries)
+        if len(self.__pending) >= self.batch_size:
+            self.flush()
+
+    def compact(self, cutoff: datetime.datetime, openings: List[JournalEntry]) -> List[JournalEntry]:
+        """
+        Same as :meth:`~pyluca.journal.Journal.compact`, rewriting the entries of the key in the table in a single
+        transaction along with the number of openings and the cutoff. Raises exception if the journal is of a date range, as
+        the entries outside it are not loaded
+
+        :raises: ValueError
+        """
+        if self.start is not None or self.end is not None:
+            raise ValueError('A journal of a date range cannot be compacted')
+        self.flush()
+        removed = super(SQLiteJournal, self).compact(cutoff, openings)
+        self.__sl_no_offset = 0
+        with self.connection:
+            self.connection.execute(f'DELETE FROM {self.table} WHERE key = ?', (self.key,))
+            self.__insert(self.entries)
+            self.connection.execute(
+                f'INSERT OR REPLACE INTO {self.table}_openings (key, opening_count, closed_till) VALUES (?, ?, ?)',
+                (self.key, self.opening_count, to_epoch(cutoff))
+            )
+        return removed
+
+    def __insert(self, entries: List[JournalEntry]):
+        self.connection.executemany(
+            f'INSERT INTO {self.table} (key, sl_no, account, dr_amount, cr_amount, date, narration, event_id) '
+            f'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                (
+                    self.key, entry.sl_no + self.__sl_no_offset, entry.account, entry.dr_amount, entry.cr_amount,
+                    to_epoch(entry.date), str(entry.narration), entry.event_id
+                )
+                for entry in entries
+            ]
+        )
+
+    def flush(self):
+        """
+        Writes the added entries not written yet, in a single transaction
+        """
+        if not self.__pending:
+            return
+        with self.connection:
+            self.__insert(self.__pending)
+        self.__pending = []
+
+    def close(self):
+        """
+        Flushes the added entries. The connection is left open for the other journals sharing it
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,10 +1,16 @@
+import sqlite3
+import tempfile
 from collections import defaultdict
 from datetime import datetime
 from unittest import TestCase
 
-from pyluca.accountant import Accountant
-from pyluca.journal import Journal, InvalidEntryException
+from pyluca.accountant import Accountant, Posting
+from pyluca.columnar_journal import ColumnarJournal
+from pyluca.journal import Journal, JournalEntry, InvalidEntryException
+from pyluca.journal_file import MappedJournal
+from pyluca.sqlite_journal import SQLiteJournal
 from pyluca.ledger import Ledger
+from pyluca.aging import get_account_aging
 from pyluca.tests.test_aging import account_config
 
 
@@ -43,3 +49,237 @@ class TestAccountant(TestCase):
             InvalidEntryException,
             lambda: accountant.enter_journal('LOANS', 'SAVINGS_BANK', 5000, datetime(2023, 1, 1), 'Loans')
         )
+
+    def test_enter_journals(self):
+        postings = [
+            Posting('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary'),
+            ('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1), 'ELSS', 'e1'),
+            Posting('LOANS', 'SAVINGS_BANK', 0, datetime(2022, 5, 2), 'Nothing'),
+            Posting('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 2), 'EMI 3/48')
+        ]
+        for compact in [False, True]:
+            expected = Accountant(Journal(), account_config, 'person1')
+            for posting in postings:
+                expected.enter_journal(*posting)
+            accountant = Accountant(Journal(), account_config, 'person1', compact)
+            accountant.enter_journals(postings[:1])
+            accountant.enter_journals(postings[1:])
+            self.assertEqual(
+                [je.__dict__ for je in expected.journal.entries],
+                [je.__dict__ for je in accountant.journal.entries]
+            )
+            self.assertEqual(expected.ledger.get_ledger(), accountant.ledger.get_ledger())
+
+            with self.assertRaises(InvalidEntryException) as e:
+                accountant.enter_journals([
+                    Posting('LOANS', 'SAVINGS_BANK', 100, datetime(2022, 5, 3), 'Lend'),
+                    Posting('LOANS', 'SAVINGS_BANK', 100, datetime(2022, 5, 1), 'Lend')
+                ])
+            self.assertIn('posting 1 of the batch', str(e.exception))
+            with self.assertRaises(InvalidEntryException) as e:
+                accountant.enter_journals([
+                    Posting('LOANS', 'SAVINGS_BANK', 0, datetime(2022, 5, 3), 'Nothing'),
+                    Posting('LOANS', 'SAVINGS_BANK', 100, datetime(2022, 5, 1), 'Lend')
+                ])
+            self.assertIn('posting 1 of the batch', str(e.exception))
+            self.assertEqual(len(accountant.journal.entries), 6)
+            self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK'), 7000)
+
+    def test_backdated_entries(self):
+        postings = [
+            Posting('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary', 'e1'),
+            Posting('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1), 'ELSS', 'e2'),
+            Posting('LOANS', 'SAVINGS_BANK', 5000, datetime(2022, 5, 2), 'Lend', 'e3'),
+            Posting('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 2), 'EMI 3/48', 'e4'),
+            Posting('SAVINGS_BANK', 'LOANS_PAYBACK', 1000, datetime(2022, 5, 5), 'Payback', 'e5')
+        ]
+        arrival = [postings[0], postings[2], postings[4], postings[1], postings[3]]
+        for compact in [False, True]:
+            expected = Accountant(Journal(), account_config, 'person1', compact)
+            for posting in postings:
+                expected.enter_journal(*posting)
+            accountant = Accountant(Journal(allow_backdated=True), account_config, 'person1', compact)
+            accountant.enter_journals(arrival[:3])
+            self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK'), 16000)
+            for posting in arrival[3:]:
+                accountant.enter_journal(*posting)
+            self.assertEqual(
+                [je.__dict__ for je in expected.journal.entries],
+                [je.__dict__ for je in accountant.journal.entries]
+            )
+            self.assertEqual(expected.ledger.get_ledger(), accountant.ledger.get_ledger())
+            self.assertEqual(expected.ledger.get_balances(), accountant.ledger.get_balances())
+            self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK', datetime(2022, 5, 1)), 10000)
+            self.assertEqual(accountant.journal.max_date, datetime(2022, 5, 5))
+
+    def test_close_period(self):
+        postings = [
+            Posting('SAVINGS_BANK', 'SALARY', 20000.1, datetime(2022, 4, 30), 'April salary'),
+            Posting('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000.7, datetime(2022, 5, 1), 'ELSS'),
+            Posting('LOANS', 'SAVINGS_BANK', 5000.3, datetime(2022, 5, 2), 'Lend'),
+            Posting('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 2), 'EMI 3/48'),
+            Posting('SAVINGS_BANK', 'LOANS', 1000.9, datetime(2022, 5, 5), 'Payback'),
+            Posting('SAVINGS_BANK', 'SALARY', 20000.1, datetime(2022, 5, 31), 'May salary')
+        ]
+        expected = Accountant(Journal(), account_config, 'person1')
+        expected.enter_journals(postings)
+        accountant = Accountant(Journal(), account_config, 'person1')
+        accountant.enter_journals(postings[:5])
+        archive = Journal()
+        removed = accountant.close_period(datetime(2022, 5, 2), archive)
+        accountant.enter_journal(*postings[5])
+
+        self.assertEqual(len(removed), 8)
+        self.assertEqual(archive.entries, removed)
+        self.assertEqual([je.sl_no for je in accountant.journal.entries], list(range(len(accountant.journal.entries))))
+        self.assertEqual(
+            [(je.account, je.dr_amount, je.cr_amount) for je in accountant.journal.entries[:5]],
+            [
+                ('SALARY', 0, 20000.1),
+                ('SAVINGS_BANK', 1999.0999999999976, 0),
+                ('MUTUAL_FUNDS', 10000.7, 0),
+                ('LOANS', 5000.3, 0),
+                ('CAR_EMI', 3000, 0)
+            ]
+        )
+        for as_of in [datetime(2022, 5, 2), datetime(2022, 5, 5), datetime(2022, 6, 1), None]:
+            self.assertEqual(expected.ledger.get_balances(as_of), accountant.ledger.get_balances(as_of))
+        self.assertEqual(accountant.journal.max_date, datetime(2022, 5, 31))
+        self.assertEqual(len(accountant.ledger.get_df()), 9)
+
+    def test_close_period_again(self):
+        postings = [
+            Posting('SAVINGS_BANK', 'SALARY', 1000, datetime(2022, 4, 30), 'April salary'),
+            Posting('LOANS', 'SAVINGS_BANK', 500, datetime(2022, 5, 1), 'Lend'),
+            Posting('SAVINGS_BANK', 'LOANS', 200, datetime(2022, 5, 3), 'Payback'),
+            Posting('CAR_EMI', 'SAVINGS_BANK', 300, datetime(2022, 5, 4), 'EMI 3/48'),
+            Posting('SAVINGS_BANK', 'SALARY', 1000, datetime(2022, 5, 31), 'May salary')
+        ]
+        expected = Accountant(Journal(), account_config, 'person1')
+        expected.enter_journals(postings)
+        connection = sqlite3.connect(':memory:')
+        journals = [
+            lambda: Journal(),
+            lambda: ColumnarJournal(capacity=2),
+            lambda: SQLiteJournal(connection, 'person1')
+        ]
+        for new_journal in journals:
+            accountant = Accountant(new_journal(), account_config, 'person1')
+            accountant.enter_journals(postings[:4])
+            archive = Journal()
+            self.assertEqual(len(accountant.close_period(datetime(2022, 5, 1), archive)), 4)
+            self.assertEqual(len(accountant.close_period(datetime(2022, 5, 3), archive)), 2)
+            self.assertRaises(ValueError, lambda: accountant.close_period(datetime(2022, 5, 2), archive))
+            accountant.enter_journal(*postings[4])
+
+            self.assertEqual([je.sl_no for je in archive.entries], list(range(6)))
+            self.assertEqual(
+                [(je.account, je.dr_amount, je.cr_amount) for je in archive.entries],
+                [(je.account, je.dr_amount, je.cr_amount) for je in expected.journal.entries[:6]]
+            )
+            self.assertEqual(
+                Ledger(archive, account_config, 'person1').get_balances(),
+                expected.ledger.get_balances(datetime(2022, 5, 3))
+            )
+            self.assertEqual(
+                [je.sl_no for je in accountant.journal.entries], list(range(len(accountant.journal.entries)))
+            )
+            for as_of in [datetime(2022, 5, 3), datetime(2022, 5, 4), None]:
+                self.assertEqual(expected.ledger.get_balances(as_of), accountant.ledger.get_balances(as_of))
+        accountant.journal.flush()
+        reopened = Accountant(SQLiteJournal(connection, 'person1'), account_config, 'person1')
+        self.assertEqual(reopened.journal.opening_count, 3)
+        self.assertEqual(reopened.ledger.get_balances(), expected.ledger.get_balances())
+        self.assertEqual(len(reopened.close_period(datetime(2022, 5, 4))), 2)
+        self.assertRaises(
+            ValueError, lambda: SQLiteJournal(connection, 'person1', start=datetime(2022, 5, 4)).compact(
+                datetime(2022, 5, 5), []
+            )
+        )
+        with tempfile.TemporaryDirectory() as path:
+            with MappedJournal(path) as mapped:
+                accountant = Accountant(mapped, account_config, 'person1')
+                accountant.enter_journals(postings)
+                self.assertRaises(ValueError, lambda: accountant.close_period(datetime(2022, 5, 1)))
+
+    def test_close_period_backdated(self):
+        postings = [
+            Posting('SAVINGS_BANK', 'SALARY', 1000, datetime(2022, 4, 30), 'April salary'),
+            Posting('LOANS', 'SAVINGS_BANK', 500, datetime(2022, 5, 1), 'Lend'),
+            Posting('SAVINGS_BANK', 'LOANS', 200, datetime(2022, 5, 3), 'Payback'),
+            Posting('CAR_EMI', 'SAVINGS_BANK', 300, datetime(2022, 5, 6), 'EMI 3/48'),
+            Posting('SAVINGS_BANK', 'LOANS', 100, datetime(2022, 5, 5), 'Payback'),
+        ]
+        expected = Accountant(Journal(allow_backdated=True), account_config, 'person1')
+        for posting in postings:
+            expected.enter_journal(*posting)
+        accountant = Accountant(Journal(allow_backdated=True), account_config, 'person1')
+        for posting in postings[:4]:
+            accountant.enter_journal(*posting)
+        archive = Journal()
+        accountant.close_period(datetime(2022, 5, 4), archive)
+        self.assertEqual(accountant.journal.closed_till, datetime(2022, 5, 4))
+        for date in [datetime(2022, 5, 2), datetime(2022, 5, 4)]:
+            with self.assertRaises(InvalidEntryException) as e:
+                accountant.enter_journal('LOANS', 'SAVINGS_BANK', 50, date, 'Lend')
+            self.assertIn('closed period', str(e.exception))
+        self.assertRaises(InvalidEntryException, lambda: accountant.enter_journals([
+            Posting('LOANS', 'SAVINGS_BANK', 50, datetime(2022, 5, 7), 'Lend'),
+            Posting('LOANS', 'SAVINGS_BANK', 50, datetime(2022, 5, 3), 'Lend')
+        ]))
+        accountant.enter_journal(*postings[4])
+        accountant.close_period(datetime(2022, 5, 7), archive)
+
+        self.assertEqual(
+            sorted([(je.account, je.dr_amount, je.cr_amount, je.date) for je in archive.entries]),
+            sorted([(je.account, je.dr_amount, je.cr_amount, je.date) for je in expected.journal.entries])
+        )
+        self.assertEqual(accountant.ledger.get_balances(), expected.ledger.get_balances())
+
+        connection = sqlite3.connect(':memory:')
+        accountant = Accountant(SQLiteJournal(connection, 'person1'), account_config, 'person1')
+        accountant.enter_journals(postings[:4])
+        accountant.close_period(datetime(2022, 5, 4))
+        reopened = SQLiteJournal(connection, 'person1')
+        self.assertEqual(reopened.closed_till, datetime(2022, 5, 4))
+        self.assertRaises(InvalidEntryException, lambda: reopened.add_entry(
+            JournalEntry(reopened.next_sl_no(), 'LOANS', 50, 0, datetime(2022, 5, 4), 'Lend', 'person1', None)
+        ))
+
+    def test_minor_units(self):
+        config = {**account_config, 'minor_units': 100}
+        accountant = Accountant(Journal(), config, 'person1')
+        for i in range(1, 11):
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 0.1, datetime(2022, 5, i), f'Lend {i}')
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 0.2, datetime(2022, 5, 11), 'Payback')
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 0.001, datetime(2022, 5, 11), 'Rounds to nothing')
+        accountant.enter_journals([Posting('SAVINGS_BANK', 'SALARY', 1000.29, datetime(2022, 5, 12), 'Salary')])
+
+        self.assertEqual(len(accountant.journal.entries), 24)
+        self.assertEqual([je.dr_amount for je in accountant.journal.entries[:2]], [10, 0])
+        self.assertIsInstance(accountant.journal.entries[-1].cr_amount, int)
+        self.assertEqual(accountant.journal.entries[-1].cr_amount, 100029)
+        self.assertEqual(accountant.ledger.ledgers['LOANS'].get_balance(), 80)
+        self.assertEqual(accountant.ledger.get_account_balance('LOANS'), 0.8)
+        self.assertEqual(accountant.ledger.get_account_dr('LOANS'), 1.0)
+        self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK', datetime(2022, 5, 11)), -0.8)
+        self.assertEqual(accountant.ledger.get_account_type_balance('ASSET'), 1000.29)
+        self.assertEqual(Ledger(accountant.journal, config).get_balances(), accountant.ledger.get_balances())
+        self.assertEqual(accountant.ledger.get_ledger()[-1]['cr_amount'], 1000.29)
+        self.assertEqual(accountant.ledger.get_df()['dr_amount'].sum(), 1001.49)
+
+        aging = get_account_aging(config, accountant.journal.entries, 'LOANS', datetime(2022, 5, 30))
+        self.assertEqual([age.counter.get_balance() for age in aging.ages], [0, 0] + [0.1] * 8)
+        self.assertEqual([payment.amount for payment in aging.ages[1].counter.payments], [0.1])
+        self.assertEqual(aging.ages[1].journal_entry.dr_amount, 0.1)
+        self.assertEqual(aging.ages[1].counter.payments[0].meta['entry']['cr_amount'], 0.2)
+        self.assertEqual(accountant.journal.entries[aging.ages[1].journal_entry.sl_no].dr_amount, 10)
+
+        aging = get_account_aging(config, accountant.journal.entries, 'LOANS', datetime(2022, 5, 5))
+        self.assertEqual([age.counter.total_amount for age in aging.ages], [0.1] * 5)
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 0.35, datetime(2022, 5, 13), 'Payback')
+        aging = get_account_aging(config, accountant.journal.entries, 'LOANS', datetime(2022, 5, 30), aging)
+        self.assertEqual([age.counter.get_balance() for age in aging.ages], [0] * 5 + [0.05] + [0.1] * 4)
+        self.assertEqual(aging.excess_amount, 0)
+        self.assertEqual([age.journal_entry.dr_amount for age in aging.ages], [0.1] * 10)
+        self.assertEqual(aging.ages[5].counter.payments[0].meta['entry']['cr_amount'], 0.35)
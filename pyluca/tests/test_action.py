@@ -1,9 +1,10 @@
 from datetime import datetime
 from unittest import TestCase
 from pyluca.accountant import Accountant
-from pyluca.action import apply
+from pyluca.action import apply, compile_actions, apply_many
 from pyluca.event import Event
-from pyluca.journal import Journal
+from pyluca.aging import get_account_aging
+from pyluca.journal import Journal, Narration
 from pyluca.ledger import Ledger
 
 personal_fin_config = {
@@ -354,3 +355,153 @@ class TestAction(TestCase):
             apply(e, accountant, external_actions={'check_balance': __check_balance})
 
         self.assertTrue(local_state['checked'])
+
+    def test_apply_many(self):
+        events = [
+            SalaryEvent('1', 20000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+            InvestMFEvent('2', 10000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+            LendEvent('3', 3000, '2022-6-21', datetime(2022, 4, 22), datetime(2022, 4, 22)),
+            ClearLoansEvent('4', datetime(2022, 4, 25), datetime(2022, 4, 25)),
+            MFProfitEvent('5', datetime(2022, 4, 30), datetime(2022, 4, 30))
+        ]
+        interpreted = Accountant(Journal(), personal_fin_config, '1')
+        for e in events:
+            apply(e, interpreted, {'multiplier': .18})
+
+        accountant = Accountant(Journal(), personal_fin_config, '1')
+        stats = apply_many((e for e in events), accountant, {'multiplier': .18}, batch_size=2)
+        self.assertEqual([s.events for s in stats], [2, 2, 1])
+        self.assertEqual([s.entries for s in stats], [4, 4, 2])
+        self.assertEqual(
+            [je.__dict__ for je in interpreted.journal.entries],
+            [je.__dict__ for je in accountant.journal.entries]
+        )
+        self.assertEqual(apply_many([], accountant), [])
+
+    def test_apply_many_vectorized(self):
+        events = [
+            SalaryEvent('1', 20000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+            *[
+                LendEvent(f'l{i}', 100 + i, '2022-6-21', datetime(2022, 4, 22), datetime(2022, 4, 22), risky=i % 2 == 0)
+                for i in range(5)
+            ],
+            ClearLoansEvent('2', datetime(2022, 4, 25), datetime(2022, 4, 25)),
+            *[FreelancingSalaryEvent(f'f{i}', 1000 * i, datetime(2022, 4, 26), datetime(2022, 4, 26)) for i in range(4)],
+            FreelancingSalaryEvent('f', 1234.5, datetime(2022, 4, 27), datetime(2022, 4, 27)),
+            InvestMFEvent('3', 1000, datetime(2022, 4, 28), datetime(2022, 4, 28)),
+            MFProfitEvent('4', datetime(2022, 4, 30), datetime(2022, 4, 30))
+        ]
+        interpreted = Accountant(Journal(), personal_fin_config, '1')
+        for e in events:
+            apply(e, interpreted, {'multiplier': .18})
+
+        accountant = Accountant(Journal(), personal_fin_config, '1')
+        stats = apply_many(events, accountant, {'multiplier': .18}, batch_size=4, vectorize=True)
+        self.assertEqual(sum([s.events for s in stats]), len(events))
+        self.assertEqual(
+            [je.__dict__ for je in interpreted.journal.entries],
+            [je.__dict__ for je in accountant.journal.entries]
+        )
+        self.assertEqual(
+            [type(je.dr_amount) for je in interpreted.journal.entries],
+            [type(je.dr_amount) for je in accountant.journal.entries]
+        )
+
+    def test_compiled_plan(self):
+        def _events():
+            return [
+                SalaryEvent('1', 20000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+                InvestMFEvent('2', 10000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+                LendEvent('3', 3000, '2022-6-21', datetime(2022, 4, 22), datetime(2022, 4, 22)),
+                LendEvent('4', 2000, '2022-6-22', datetime(2022, 4, 23), datetime(2022, 4, 23), risky=True),
+                ClearLoansEvent('5', datetime(2022, 4, 25), datetime(2022, 4, 25)),
+                MFProfitEvent('6', datetime(2022, 4, 30), datetime(2022, 4, 30)),
+                FreelancingSalaryEvent('7', 20000, datetime(2022, 5, 1), datetime(2022, 5, 1)),
+                LiquidLoanRepaymentsEvent('8', datetime(2022, 5, 2), datetime(2022, 5, 2))
+            ]
+
+        interpreted = Accountant(Journal(), personal_fin_config, '1')
+        for e in _events():
+            apply(e, interpreted, {'multiplier': .18})
+
+        plan = compile_actions(personal_fin_config)
+        compiled = Accountant(Journal(), personal_fin_config, '1')
+        for e in _events():
+            apply(e, compiled, {'multiplier': .18}, plan=plan)
+
+        self.assertEqual(
+            [je.__dict__ for je in interpreted.journal.entries],
+            [je.__dict__ for je in compiled.journal.entries]
+        )
+        self.assertEqual(interpreted.ledger.get_balances(), compiled.ledger.get_balances())
+
+    def test_narration_template(self):
+        config = {
+            **personal_fin_config,
+            'actions_config': {
+                'on_event': {
+                    'LendEvent': {
+                        'actions': [
+                            {
+                                'dr_account': 'LOANS',
+                                'cr_account': 'SAVINGS_BANK',
+                                'amount': 'amount',
+                                'narration': narration
+                            }
+                            for narration in [
+                                'Lend due on {due_date}',
+                                'Lend {due_date} due_date',
+                                'Lend {due_date} {due_date} {event_id}}',
+                                'Lend {context.to}, {due_date}',
+                                'Lend {str.a.b} {due_date}'
+                            ]
+                        ]
+                    }
+                }
+            }
+        }
+        events = [
+            LendEvent('1', 100, '2022-6-21', datetime(2022, 4, 21), datetime(2022, 4, 21)),
+            LendEvent('2', 100, 'due_date', datetime(2022, 4, 22), datetime(2022, 4, 22)),
+            LendEvent('3', 100, 'event_id', datetime(2022, 4, 23), datetime(2022, 4, 23)),
+            LendEvent('4', 100, 'x{y}', datetime(2022, 4, 24), datetime(2022, 4, 24))
+        ]
+        interpreted, compiled = Accountant(Journal(), config, '1'), Accountant(Journal(), config, '1')
+        plan = compile_actions(config)
+        for e in events:
+            apply(e, interpreted, {'to': 'str.Ravi'})
+            apply(e, compiled, {'to': 'str.Ravi'}, plan=plan)
+        narrations = [je.narration for je in interpreted.journal.entries[::2]]
+        self.assertEqual(narrations, [je.narration for je in compiled.journal.entries[::2]])
+        self.assertEqual(narrations[:5], [
+            'Lend due on 2022-6-21',
+            'Lend 2022-6-21 2022-6-21',
+            'Lend 2022-6-21 2022-6-21 1',
+            'Lend Ravi, 2022-6-21',
+            'Lend a.b 2022-6-21'
+        ])
+        self.assertEqual(narrations[5:7], ['Lend due on due_date', 'Lend due_date due_date'])
+        self.assertEqual(narrations[-5], 'Lend due on xy')
+
+    def test_lazy_meta(self):
+        events = [
+            InvestMFEvent('1', 20000, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+            LendEvent('2', 5000, '2022-6-21', datetime(2022, 4, 22), datetime(2022, 4, 22))
+        ]
+        interpreted, lazy = Accountant(Journal(), personal_fin_config, '1'), Accountant(Journal(), personal_fin_config, '1')
+        plan = compile_actions(personal_fin_config, lazy_meta=True)
+        for e in events:
+            apply(e, interpreted)
+            apply(e, lazy, plan=plan)
+        narration = lazy.journal.entries[2].narration
+        self.assertIsInstance(narration, Narration)
+        self.assertEqual(narration.meta, {'due_date': '2022-6-21'})
+        self.assertEqual(narration, 'Lend ##{"due_date": "2022-6-21"}##')
+        self.assertEqual(str(narration), interpreted.journal.entries[2].narration)
+        self.assertEqual(
+            [je.__dict__ for je in interpreted.journal.entries],
+            [je.__dict__ for je in lazy.journal.entries]
+        )
+        self.assertEqual(interpreted.ledger.get_ledger(), lazy.ledger.get_ledger())
+        aging = get_account_aging(personal_fin_config, lazy.journal.entries, 'LOANS', datetime(2022, 4, 30))
+        self.assertEqual(aging.ages[0].meta, {'due_date': '2022-6-21'})
@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from unittest import TestCase
 from pyluca.accountant import Accountant
-from pyluca.aging import get_account_aging, get_accounts_aging
+from pyluca.aging import get_account_aging, get_accounts_aging, repair_accounts_aging
 from pyluca.journal import JournalEntry, Journal
 from pyluca.ledger import Ledger
 
@@ -280,3 +280,28 @@ class TestAging(TestCase):
         self.assertEqual(age.counter.payments[0].meta['entry']['event_id'], 'event2')
         self.assertEqual(age.counter.payments[1].meta['entry']['event_id'], 'event3')
 
+    def test_repair_accounts_aging(self):
+        journal = Journal(allow_backdated=True)
+        accountant = Accountant(journal, account_config, 'person1')
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 1000, datetime(2022, 5, 1), 'Lend')
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 2000, datetime(2022, 5, 3), 'Lend')
+        accountant.enter_journal('SAVINGS_BANK', 'SALARY', 5000, datetime(2022, 5, 4), 'Salary')
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 1500, datetime(2022, 5, 5), 'Payback')
+        aging = get_accounts_aging(account_config, journal.entries, ['LOANS', 'SALARY'], datetime(2022, 5, 5))
+        salary_aging = aging['SALARY']
+
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 500, datetime(2022, 5, 2), 'Lend')
+        aging = repair_accounts_aging(account_config, journal.entries, aging, journal.entries[2:4])
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 700, datetime(2022, 5, 6), 'Payback')
+        aging = get_accounts_aging(account_config, journal.entries, ['LOANS', 'SALARY'], datetime(2022, 5, 6), aging)
+
+        expected = get_accounts_aging(account_config, journal.entries, ['LOANS', 'SALARY'], datetime(2022, 5, 6))
+        self.assertIs(aging['SALARY'], salary_aging)
+        for account in ['LOANS', 'SALARY']:
+            self.assertEqual(aging[account].last_sl_no, expected[account].last_sl_no)
+            self.assertEqual(aging[account].excess_amount, expected[account].excess_amount)
+            self.assertEqual(
+                [(age.date, age.counter.get_balance()) for age in aging[account].ages],
+                [(age.date, age.counter.get_balance()) for age in expected[account].ages]
+            )
+        self.assertEqual([age.counter.get_balance() for age in aging['LOANS'].ages], [0, 0, 1300])
@@ -0,0 +1,50 @@
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.aging import get_accounts_aging
+from pyluca.columnar_journal import ColumnarJournal
+from pyluca.journal import Journal, JournalEntry, InvalidEntryException
+from pyluca.ledger import Ledger
+from pyluca.tests.test_aging import account_config
+
+
+def _pass_entries(accountant: Accountant):
+    accountant.enter_journal('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary')
+    for i in range(1, 10):
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 1000, datetime(2022, 5, i), f'Lend {i}', f'lend-{i}')
+    accountant.enter_journal('SAVINGS_BANK', 'LOANS', 2500.5, datetime(2022, 5, 20), 'Payback')
+
+
+class TestColumnarJournal(TestCase):
+    def test_columnar_journal(self):
+        accountant = Accountant(Journal(), account_config, 'person1')
+        columnar_accountant = Accountant(ColumnarJournal(capacity=4), account_config, 'person1')
+        _pass_entries(accountant)
+        _pass_entries(columnar_accountant)
+        journal, columnar = accountant.journal, columnar_accountant.journal
+
+        self.assertEqual(len(columnar.entries), 22)
+        self.assertEqual([je.__dict__ for je in journal.entries], [je.__dict__ for je in columnar.entries])
+        self.assertEqual(columnar.entries[-1].__dict__, journal.entries[-1].__dict__)
+        self.assertEqual([je.sl_no for je in columnar.entries[20:]], [20, 21])
+        self.assertEqual(columnar.max_date, datetime(2022, 5, 20))
+        self.assertRaises(InvalidEntryException, lambda: columnar.add_entry(
+            JournalEntry(22, 'LOANS', 10, 0, datetime(2022, 5, 19), 'Backdated', 'person1', None)
+        ))
+
+        self.assertEqual(
+            Ledger(journal, account_config, 'person1').get_ledger(),
+            Ledger(columnar, account_config, 'person1').get_ledger()
+        )
+        self.assertEqual(len(Ledger(columnar, account_config).get_df()), 22)
+
+        aging = get_accounts_aging(account_config, journal.entries, ['LOANS'], datetime(2022, 5, 30))
+        columnar_aging = get_accounts_aging(account_config, columnar.entries, ['LOANS'], datetime(2022, 5, 30))
+        self.assertEqual(
+            [(age.date, age.counter.get_balance()) for age in aging['LOANS'].ages],
+            [(age.date, age.counter.get_balance()) for age in columnar_aging['LOANS'].ages]
+        )
+
+        reopened = ColumnarJournal(journal.entries)
+        self.assertEqual(reopened.max_date, datetime(2022, 5, 20))
+        self.assertEqual([je.__dict__ for je in journal.entries], [je.__dict__ for je in reopened.entries])
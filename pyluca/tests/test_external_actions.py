@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.action import apply, apply_many
+from pyluca.external_actions import AsyncExternalActions
+from pyluca.journal import Journal
+from pyluca.tests.test_action import personal_fin_config, SalaryEvent
+
+config = {
+    **personal_fin_config,
+    'actions_config': {
+        'on_event': {
+            'SalaryEvent': {
+                'actions': [
+                    {
+                        'dr_account': 'SAVINGS_BANK',
+                        'cr_account': 'SALARY',
+                        'amount': 'amount',
+                        'narration': 'Salary'
+                    },
+                    {
+                        'type': 'external_action.notify',
+                        'context': {
+                            'balance': 'balance.SAVINGS_BANK',
+                            'event_id': 'event_id'
+                        }
+                    }
+                ]
+            }
+        }
+    }
+}
+
+
+class TestAsyncExternalActions(TestCase):
+    def test_batching(self):
+        sink, state = [], {'in_flight': 0, 'max_in_flight': 0}
+
+        async def notify(calls):
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            await asyncio.sleep(0.001)
+            sink.append(calls)
+            state['in_flight'] -= 1
+
+        events = [SalaryEvent(str(i), 100, datetime(2023, 1, 1 + i), datetime(2023, 1, 1 + i)) for i in range(25)]
+        accountant = Accountant(Journal(), config, '1')
+        with AsyncExternalActions({'notify': notify}, batch_size=10, max_in_flight=2, max_pending=15) as actions:
+            for e in events[:5]:
+                apply(e, accountant, external_actions=actions)
+            apply_many(events[5:], accountant, external_actions=actions)
+            actions.flush()
+            self.assertEqual(sum([len(calls) for calls in sink]), 25)
+        self.assertLessEqual(max([len(calls) for calls in sink]), 10)
+        self.assertLessEqual(state['max_in_flight'], 2)
+        calls = sorted([call for calls in sink for call in calls], key=lambda c: int(c['event_id']))
+        self.assertEqual([call['event_id'] for call in calls], [e.event_id for e in events])
+        self.assertEqual([call['balance'] for call in calls], [100 * (i + 1) for i in range(25)])
+
+    def test_plain_handlers(self):
+        lock, state = threading.Lock(), {'in_flight': 0, 'max_in_flight': 0}
+
+        def notify(calls):
+            with lock:
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            time.sleep(0.05)
+            with lock:
+                state['in_flight'] -= 1
+
+        start = time.time()
+        with AsyncExternalActions({'notify': notify}, batch_size=1, max_in_flight=4) as actions:
+            for i in range(8):
+                actions['notify'](event_id=str(i))
+        self.assertLess(time.time() - start, 0.3)
+        self.assertEqual(state['max_in_flight'], 4)
+
+    def test_errors(self):
+        def notify(calls):
+            raise ValueError('sink down')
+
+        actions = AsyncExternalActions({'notify': notify}, batch_size=2)
+        apply(SalaryEvent('1', 100, datetime(2023, 1, 1), datetime(2023, 1, 1)), Accountant(Journal(), config, '1'),
+              external_actions=actions)
+        self.assertRaises(ValueError, actions.flush)
+        self.assertRaises(KeyError, lambda: actions['unknown'])
+
+        actions['notify'](event_id='2')
+        actions['notify'](event_id='3')
+        time.sleep(0.05)
+        actions['notify'](event_id='4')
+        self.assertRaises(ValueError, lambda: actions['notify'](event_id='5'))
+        self.assertRaises(ValueError, actions.close)
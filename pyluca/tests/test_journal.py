@@ -1,3 +1,4 @@
+import pickle
 from datetime import datetime
 from unittest import TestCase
 from pyluca.journal import Journal, JournalEntry, InvalidEntryException
@@ -29,3 +30,100 @@ class TestJournal(TestCase):
             JournalEntry(7, 'SAVINGS_BANK', 2000, 0, datetime(2023, 2, 1), 'Invest something', 'person2', None)
         ))
 
+    def test_journal_entry_slots(self):
+        entry = JournalEntry(1, 'SAVINGS_BANK', 30000, 0, datetime(2023, 1, 31), 'Jan Salary', 'person2', None)
+        self.assertEqual(entry.__dict__, {
+            'sl_no': 1,
+            'account': 'SAVINGS_BANK',
+            'dr_amount': 30000,
+            'cr_amount': 0,
+            'date': datetime(2023, 1, 31),
+            'narration': 'Jan Salary',
+            'key': 'person2',
+            'event_id': None
+        })
+        self.assertRaises(AttributeError, lambda: setattr(entry, 'unknown', 1))
+        self.assertEqual(pickle.loads(pickle.dumps(entry)).__dict__, entry.__dict__)
+        self.assertEqual(entry.as_dict(), entry.__dict__)
+
+        def update():
+            entry.__dict__['dr_amount'] = 100
+        self.assertRaises(TypeError, update)
+        row = entry.as_dict()
+        row['dr_amount'] = 100
+        self.assertEqual(entry.dr_amount, 30000)
+
+    def test_add_journal_entries(self):
+        journal = Journal()
+        journal.add_entries([
+            JournalEntry(0, 'SAVINGS_BANK', 30000, 0, datetime(2023, 1, 31), 'Jan Salary', 'person2', None),
+            JournalEntry(1, 'SALARY', 0, 30000, datetime(2023, 1, 31), 'Jan Salary', 'person2', None),
+            JournalEntry(2, 'LOANS', 5000, 0, datetime(2023, 2, 1), 'Lend to person2', 'person2', None),
+            JournalEntry(3, 'SAVINGS_BANK', 0, 5000, datetime(2023, 2, 1), 'Lend to person2', 'person2', None)
+        ])
+        self.assertEqual(len(journal.entries), 4)
+        self.assertEqual(journal.max_date, datetime(2023, 2, 1))
+
+        with self.assertRaises(InvalidEntryException) as e:
+            journal.add_entries([
+                JournalEntry(4, 'LOANS_PAYBACK', 2500, 0, datetime(2023, 2, 2), 'Loans Payback', 'person2', None),
+                JournalEntry(5, 'LOANS', 0, 2500, datetime(2023, 2, 2), 'Loans Payback', 'person2', None),
+                JournalEntry(6, 'SAVINGS_BANK', 2000, 0, datetime(2023, 1, 1), 'Invest something', 'person2', None)
+            ])
+        self.assertTrue(str(e.exception).startswith('Backdated entries cannot be added for entry 2 of the batch'))
+        self.assertEqual(len(journal.entries), 4)
+        self.assertEqual(journal.max_date, datetime(2023, 2, 1))
+        self.assertRaises(InvalidEntryException, lambda: journal.add_entries([
+            JournalEntry(4, 'SAVINGS_BANK', 2000, 0, datetime(2023, 1, 31), 'Invest something', 'person2', None)
+        ]))
+
+    def test_journal_index(self):
+        entries = [
+            JournalEntry(2, 'LOANS', 5000, 0, datetime(2023, 2, 1), 'Lend to person2', 'person2', 'e2'),
+            JournalEntry(3, 'SAVINGS_BANK', 0, 5000, datetime(2023, 2, 1), 'Lend to person2', 'person2', 'e2'),
+            JournalEntry(0, 'SAVINGS_BANK', 30000, 0, datetime(2023, 1, 31), 'Jan Salary', 'person2', 'e1'),
+            JournalEntry(1, 'SALARY', 0, 30000, datetime(2023, 1, 31), 'Jan Salary', 'person2', 'e1')
+        ]
+        journal = Journal(list(entries), indexed=True)
+        plain = Journal(list(entries))
+        journal.add_entry(
+            JournalEntry(4, 'LOANS_PAYBACK', 2500, 0, datetime(2023, 2, 2), 'Loans Payback', 'person2', 'e3')
+        )
+        journal.add_entries([
+            JournalEntry(5, 'LOANS', 0, 2500, datetime(2023, 2, 2), 'Loans Payback', 'person2', 'e3'),
+            JournalEntry(6, 'SAVINGS_BANK', 1000, 0, datetime(2023, 2, 5), 'Misc', 'person2', None),
+            JournalEntry(7, 'SALARY', 0, 1000, datetime(2023, 2, 5), 'Misc', 'person2', None)
+        ])
+        plain.add_entries(journal.entries[4:])
+
+        def sl_nos(found):
+            return [entry.sl_no for entry in found]
+
+        for j in [journal, plain]:
+            self.assertEqual(sl_nos(j.entries_for_event('e1')), [0, 1])
+            self.assertEqual(sl_nos(j.entries_for_event('e3')), [4, 5])
+            self.assertEqual(j.entries_for_event('e4'), [])
+            self.assertEqual(sl_nos(j.entries_for_account('SAVINGS_BANK')), [0, 3, 6])
+            self.assertEqual(sl_nos(j.entries_for_account('SAVINGS_BANK', start=datetime(2023, 2, 1))), [3, 6])
+            self.assertEqual(sl_nos(j.entries_for_account('SAVINGS_BANK', end=datetime(2023, 2, 1))), [0, 3])
+            self.assertEqual(j.entries_for_account('CASH'), [])
+            self.assertEqual(
+                sl_nos(j.entries_between(datetime(2023, 2, 1), datetime(2023, 2, 2))), [2, 3, 4, 5]
+            )
+            self.assertEqual(sl_nos(j.entries_between()), [0, 1, 2, 3, 4, 5, 6, 7])
+        self.assertIsNone(plain.index)
+
+    def test_journal_index_backdated(self):
+        journal = Journal(indexed=True, allow_backdated=True)
+        accounts = ['SAVINGS_BANK', 'SALARY', 'LOANS', 'CASH']
+        for idx, day in enumerate([5, 9, 1, 12, 9, 3, 1, 7, 15, 2]):
+            journal.add_entry(JournalEntry(
+                idx, accounts[idx % 4], 100, 0, datetime(2023, 1, day), 'Misc', 'person2', f'e{day % 4}'
+            ))
+            index = journal.index
+            journal.build_index()
+            self.assertEqual(dict(index.events), dict(journal.index.events))
+            self.assertEqual(index.accounts, journal.index.accounts)
+            self.assertEqual((index.dates, index.positions), (journal.index.dates, journal.index.positions))
+        self.assertEqual([entry.date.day for entry in journal.entries], [1, 1, 2, 3, 5, 7, 9, 9, 12, 15])
+        self.assertEqual([entry.sl_no for entry in journal.entries_for_event('e1')], [0, 1, 4, 6, 7])
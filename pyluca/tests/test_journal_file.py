@@ -0,0 +1,74 @@
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.aging import get_accounts_aging
+from pyluca.journal import Journal, JournalEntry, InvalidEntryException
+from pyluca.journal_file import MappedJournal, _StringTable, _PENDING_STRINGS
+from pyluca.ledger import Ledger
+from pyluca.tests.test_aging import account_config
+from pyluca.tests.test_columnar_journal import _pass_entries
+
+
+class TestMappedJournal(TestCase):
+    def test_mapped_journal(self):
+        accountant = Accountant(Journal(), account_config, 'person1')
+        _pass_entries(accountant)
+        journal = accountant.journal
+        with tempfile.TemporaryDirectory() as path:
+            with MappedJournal(path, capacity=2) as mapped:
+                mapped_accountant = Accountant(mapped, account_config, 'person1')
+                _pass_entries(mapped_accountant)
+                self.assertEqual([je.__dict__ for je in journal.entries], [je.__dict__ for je in mapped.entries])
+
+            with MappedJournal(path) as mapped:
+                self.assertEqual(len(mapped.entries), 22)
+                self.assertEqual(mapped.max_date, datetime(2022, 5, 20))
+                self.assertEqual([je.__dict__ for je in journal.entries], [je.__dict__ for je in mapped.entries])
+                self.assertEqual(
+                    Ledger(journal, account_config, 'person1').get_ledger(),
+                    Ledger(mapped, account_config, 'person1', compact=True).get_ledger()
+                )
+                aging = get_accounts_aging(account_config, mapped.entries, ['LOANS'], datetime(2022, 5, 30))
+                self.assertEqual(aging['LOANS'].ages[-1].counter.get_balance(), 1000)
+                self.assertRaises(InvalidEntryException, lambda: mapped.add_entry(
+                    JournalEntry(22, 'LOANS', 10, 0, datetime(2022, 5, 19), 'Backdated', 'person1', None)
+                ))
+                mapped.add_entry(JournalEntry(22, 'CAR_EMI', 10, 0, datetime(2022, 5, 21), 'EMI', 'person2', 'e-1'))
+
+            with MappedJournal(path) as mapped:
+                self.assertEqual(len(mapped.entries), 23)
+                self.assertEqual(mapped.entries[-1].__dict__, {
+                    'sl_no': 22,
+                    'account': 'CAR_EMI',
+                    'dr_amount': 10,
+                    'cr_amount': 0,
+                    'date': datetime(2022, 5, 21),
+                    'narration': 'EMI',
+                    'key': 'person2',
+                    'event_id': 'e-1'
+                })
+
+    def test_string_table(self):
+        with tempfile.TemporaryDirectory() as path:
+            table = _StringTable(f'{path}/texts.bin')
+            values = [f'narration {i}' for i in range(2 * _PENDING_STRINGS + 10)]
+            for i, value in enumerate(values):
+                self.assertEqual(table.append(value), i)
+                self.assertEqual(table[i], value)
+                self.assertEqual(table[i // 2], values[i // 2])
+            self.assertEqual(list(table), values)
+            table.close()
+
+            table = _StringTable(f'{path}/texts.bin')
+            self.assertEqual(table.size, len(values))
+            self.assertEqual([table[i] for i in range(table.size)], values)
+            table.append('last')
+            self.assertEqual(table[len(values)], 'last')
+            table.close()
+
+    def test_invalid_file(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(f'{path}/records.bin', 'wb') as file:
+                file.write(b'NOTAJOURNALFILE!')
+            self.assertRaises(ValueError, lambda: MappedJournal(path))
@@ -0,0 +1,61 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.journal import Journal
+from pyluca.journal_io import read_csv, read_jsonl, write_csv, write_jsonl, load
+from pyluca.ledger import Ledger
+from pyluca.tests.test_aging import account_config
+from pyluca.tests.test_columnar_journal import _pass_entries
+
+
+class TestJournalIO(TestCase):
+    def test_csv(self):
+        accountant = Accountant(Journal(), account_config, 'person1')
+        _pass_entries(accountant)
+        with tempfile.TemporaryDirectory() as path:
+            file_path = os.path.join(path, 'journal.csv')
+            self.assertEqual(write_csv(accountant.journal.entries, file_path), 22)
+            chunks = list(read_csv(file_path, chunk_size=5))
+            self.assertEqual([len(chunk) for chunk in chunks], [5, 5, 5, 5, 2])
+
+            journal = Journal()
+            ledger = Ledger(journal, account_config, 'person1')
+            load(read_csv(file_path, chunk_size=5), journal, ledger)
+        self.assertEqual(
+            [{**je.__dict__, 'narration': str(je.narration)} for je in accountant.journal.entries],
+            [je.__dict__ for je in journal.entries]
+        )
+        self.assertEqual(accountant.ledger.get_ledger(), ledger.get_ledger())
+        self.assertEqual(Ledger.for_journal(journal, account_config, 'person1').get_ledger(), ledger.get_ledger())
+        self.assertEqual(journal.max_date, accountant.journal.max_date)
+
+        file = io.StringIO()
+        self.assertEqual(write_csv(ledger.iter_ledger(), file), 22)
+        self.assertEqual(
+            file.getvalue().splitlines()[0], 'date,dr_amount,cr_amount,narration,balance,event_id,sl_no,account,key'
+        )
+
+    def test_jsonl(self):
+        accountant = Accountant(Journal(), account_config, 'person1', compact_ledger=True)
+        _pass_entries(accountant)
+        file = io.StringIO()
+        self.assertEqual(write_jsonl(accountant.journal.entries, file), 22)
+        file.seek(0)
+        journal = Journal()
+        ledger = Ledger.for_journal(journal, account_config, 'person1', compact=True)
+        load(read_jsonl(file, chunk_size=4), journal, ledger)
+        self.assertIs(Ledger.for_journal(journal, account_config, 'person1', compact=True), ledger)
+        self.assertEqual(
+            [{**je.__dict__, 'narration': str(je.narration)} for je in accountant.journal.entries],
+            [je.__dict__ for je in journal.entries]
+        )
+        self.assertEqual(accountant.ledger.get_ledger(), ledger.get_ledger())
+
+        file = io.StringIO()
+        self.assertEqual(write_jsonl(ledger.iter_ledger(), file), 22)
+        rows = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([row['sl_no'] for row in rows], list(range(22)))
+        self.assertEqual(rows[0]['date'], accountant.journal.entries[0].date.isoformat())
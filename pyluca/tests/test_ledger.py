@@ -1,8 +1,10 @@
 from datetime import datetime
 from unittest import TestCase
+import pandas as pd
+from pandas.testing import assert_frame_equal
 from pyluca.accountant import Accountant
 from pyluca.journal import Journal, JournalEntry
-from pyluca.ledger import Ledger, AccountLedger, InvalidLedgerEntry
+from pyluca.ledger import Ledger, AccountLedger, InvalidLedgerEntry, JournalLedgerEntry, UnbalancedLedger
 from pyluca.account_config import BalanceType
 from pyluca.tests.test_aging import account_config
 
@@ -326,3 +328,218 @@ class TestLedger(TestCase):
         columns = ledger.get_df().columns
         self.assertEqual('balance' in columns, False)
         self.assertEqual('account_name' in columns, True)
+
+    def test_account_balance_cache(self):
+        ledger = Ledger(Journal(), account_config, 'loan')
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 0)
+        ledger.add_entry('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary')
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 20000)
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 20000)
+        self.assertEqual(ledger.get_account_balance('MUTUAL_FUNDS'), 0)
+        ledger.add_entry('MUTUAL_FUNDS', 'SAVINGS_BANK', 5000, datetime(2022, 5, 1), 'ELSS')
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 15000)
+        self.assertEqual(ledger.get_account_balance('MUTUAL_FUNDS'), 5000)
+        self.assertEqual(ledger.get_account_balance('SALARY'), 20000)
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK', datetime(2022, 4, 30)), 20000)
+        self.assertRaises(KeyError, lambda: ledger.get_account_balance('INVALID'))
+
+    def test_compact_ledger(self):
+        accountant = Accountant(Journal(), account_config, 'loan', compact_ledger=True)
+        accountant.enter_journal('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30, 10, 15), 'April salary')
+        accountant.enter_journal('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1, 0, 0), 'ELSS')
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 5000, datetime(2022, 5, 2, 10, 40), 'Lent to friend')
+        accountant.enter_journal('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 2, 10, 45), 'EMI 3/48')
+        self.assertEqual(accountant.ledger.get_ledger(), sample_ledger)
+        self.assertEqual(Ledger(accountant.journal, account_config, 'loan', compact=True).get_ledger(), sample_ledger)
+        entry = accountant.ledger.ledgers['SAVINGS_BANK'].get_entries()[0]
+        self.assertIsInstance(entry, JournalLedgerEntry)
+        self.assertIs(entry.journal_entry, accountant.journal.entries[0])
+        self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK', datetime(2022, 5, 1)), 10000)
+        self.assertEqual(accountant.ledger.get_account_dr('SAVINGS_BANK'), 20000)
+        self.assertEqual(accountant.ledger.get_account_cr('SAVINGS_BANK'), 18000)
+        self.assertRaises(InvalidLedgerEntry, lambda: accountant.ledger.add_journal_entry(
+            JournalEntry(8, 'LOANS', 10, 0, datetime(2022, 5, 1), 'Backdated', 'loan', None)
+        ))
+
+    def test_ledger_for_journal(self):
+        journal = Journal(allow_backdated=True)
+        accountant = Accountant(journal, account_config, 'loan')
+        self.assertIs(Ledger.for_journal(journal, account_config, 'loan'), accountant.ledger)
+        accountant.enter_journal('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary')
+
+        ledger = Ledger.for_journal(journal, account_config)
+        self.assertIsNot(ledger, accountant.ledger)
+        self.assertIs(Ledger.for_journal(journal, account_config), ledger)
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 20000)
+
+        accountant.enter_journal('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1), 'ELSS')
+        journal.add_entry(JournalEntry(4, 'CAR_EMI', 3000, 0, datetime(2022, 5, 2), 'EMI', 'loan', None))
+        journal.add_entry(JournalEntry(5, 'SAVINGS_BANK', 0, 3000, datetime(2022, 5, 2), 'EMI', 'loan', None))
+        self.assertIs(Ledger.for_journal(journal, account_config), ledger)
+        self.assertEqual(ledger.get_account_balance('SAVINGS_BANK'), 7000)
+        self.assertEqual(ledger.get_ledger(), Ledger(journal, account_config).get_ledger())
+        self.assertEqual(accountant.ledger.get_account_balance('SAVINGS_BANK'), 10000)
+
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 1000, datetime(2022, 4, 30), 'Lend')
+        rebuilt = Ledger.for_journal(journal, account_config)
+        self.assertIsNot(rebuilt, ledger)
+        self.assertEqual(rebuilt.get_ledger(), Ledger(journal, account_config).get_ledger())
+        self.assertEqual(rebuilt.get_account_balance('SAVINGS_BANK'), 6000)
+        self.assertIs(Ledger.for_journal(journal, account_config, 'loan'), accountant.ledger)
+        self.assertIsNot(Ledger.for_journal(journal, account_config, 'loan', compact=True), accountant.ledger)
+
+    def test_account_dr_cr_totals(self):
+        accountant = Accountant(Journal(allow_backdated=True), account_config, 'loan')
+        for i in range(1, 20):
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 100.1 * i, datetime(2022, 5, i), f'Lend {i}')
+            accountant.enter_journal('SAVINGS_BANK', 'LOANS', 30.7 * i, datetime(2022, 5, i), f'Payback {i}')
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 55.5, datetime(2022, 5, 3), 'Late lend')
+        ledger = accountant.ledger
+        self.assertEqual(ledger.get_account_dr('CAR_EMI'), 0)
+        self.assertEqual(ledger.get_account_dr('LOANS', datetime(2022, 4, 1)), 0)
+        for as_of in [None, datetime(2022, 5, 1), datetime(2022, 5, 3), datetime(2022, 5, 10, 12), datetime(2023, 1, 1)]:
+            entries = [e for e in ledger.ledgers['LOANS'].get_entries() if as_of is None or e.date <= as_of]
+            self.assertEqual(ledger.get_account_dr('LOANS', as_of), sum([e.dr_amount for e in entries]))
+            self.assertEqual(ledger.get_account_cr('LOANS', as_of), sum([e.cr_amount for e in entries]))
+        self.assertEqual(ledger.get_account_dr('LOANS'), Ledger(accountant.journal, account_config).get_account_dr('LOANS'))
+
+    def test_add_account_balances(self):
+        accountant = Accountant(Journal(), account_config, '1')
+        for i in range(1, 10):
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 100.1 * i, datetime(2022, 5, i), f'Lend {i}')
+            accountant.enter_journal('SAVINGS_BANK', 'LOANS_PAYBACK', 30.7 * i, datetime(2022, 5, i), f'Back {i}')
+        balance_sheet = accountant.ledger.get_balance_sheet()
+        self.assertEqual(list(balance_sheet.columns[-len(account_config['accounts']):]), list(account_config['accounts']))
+
+        balances = {account: 0 for account in account_config['accounts']}
+        for idx, row in enumerate(accountant.ledger.get_ledger()):
+            debit = account_config['account_types'][account_config['accounts'][row['account']]['type']]['balance_type'] \
+                    == BalanceType.DEBIT.value
+            balances[row['account']] += row['dr_amount'] if debit else row['cr_amount']
+            balances[row['account']] -= row['cr_amount'] if debit else row['dr_amount']
+            for account, balance in balances.items():
+                self.assertEqual(balance_sheet[account].iloc[idx], balance)
+        self.assertEqual(balance_sheet['SAVINGS_BANK'].iloc[-1], accountant.ledger.get_account_balance('SAVINGS_BANK'))
+        self.assertEqual(list(balance_sheet['CAR_EMI']), [0] * len(balance_sheet))
+
+        empty = Ledger(Journal(), account_config).get_balance_sheet()
+        self.assertEqual(list(empty.columns), list(account_config['accounts']))
+
+    def test_get_df_columns(self):
+        for compact in [False, True]:
+            accountant = Accountant(Journal(), account_config, 'loan', compact_ledger=compact)
+            accountant.enter_journal('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30, 10, 15), 'April salary')
+            accountant.enter_journal('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1, 0, 0), 'ELSS')
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 5000, datetime(2022, 5, 2, 10, 40), 'Lent', 'e1')
+            accountant.enter_journal('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 2, 10, 45), 'EMI 3/48')
+            df = accountant.ledger.get_df()
+            self.assertEqual(
+                list(df.columns),
+                ['date', 'dr_amount', 'cr_amount', 'narration', 'event_id', 'sl_no', 'account', 'key', 'account_name']
+            )
+            self.assertEqual(df['account_name'].dtype, 'category')
+            assert_frame_equal(
+                df.drop(columns=['account_name']),
+                pd.DataFrame(accountant.ledger.get_ledger()).drop(columns=['balance'])
+            )
+            self.assertEqual(
+                list(df['account_name']),
+                [account_config['accounts'][account].get('name', account) for account in df['account']]
+            )
+        self.assertTrue(Ledger(Journal(), account_config).get_df().empty)
+
+    def test_get_balance_series(self):
+        accountant = Accountant(Journal(allow_backdated=True), account_config, 'loan')
+        for i in range(1, 20, 2):
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 100.1 * i, datetime(2022, 5, i, 10), f'Lend {i}')
+            accountant.enter_journal('SAVINGS_BANK', 'LOANS', 30.7 * i, datetime(2022, 5, i, 12), f'Payback {i}')
+        ledger = accountant.ledger
+        series = ledger.get_balance_series(start=datetime(2022, 4, 30), end=datetime(2022, 5, 25))
+        self.assertEqual(series.shape, (len(account_config['accounts']), 26))
+        self.assertEqual(list(series.index), list(account_config['accounts']))
+        for date in series.columns:
+            self.assertEqual(series[date].to_dict(), ledger.get_balances(date.to_pydatetime()))
+
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 55.5, datetime(2022, 5, 2), 'Late lend')
+        dates = [datetime(2022, 5, 1, 11), datetime(2022, 5, 2), datetime(2022, 5, 3, 11), datetime(2022, 6, 1)]
+        series = ledger.get_balance_series(dates)
+        for date in dates:
+            self.assertEqual(series[date].to_dict(), ledger.get_balances(date))
+        self.assertEqual(series.loc['CAR_EMI'].tolist(), [0, 0, 0, 0])
+
+    def test_account_type_balance_as_of(self):
+        accountant = Accountant(Journal(allow_backdated=True), account_config, '2')
+        accountant.enter_journal('SAVINGS_BANK', 'SALARY', 20000, datetime(2022, 4, 30), 'April salary')
+        accountant.enter_journal('MUTUAL_FUNDS', 'SAVINGS_BANK', 10000, datetime(2022, 5, 1), 'ELSS')
+        accountant.enter_journal('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 3), 'EMI 3/48')
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 5000, datetime(2022, 5, 2), 'Lend to Pramod')
+        ledger = accountant.ledger
+        self.assertEqual(ledger.chart.type_accounts['ASSET'], ['SAVINGS_BANK', 'MUTUAL_FUNDS', 'LOANS'])
+        self.assertEqual(ledger.chart.balance_types['SALARY'], BalanceType.CREDIT)
+        for as_of in [None, datetime(2022, 4, 1), datetime(2022, 4, 30), datetime(2022, 5, 1), datetime(2022, 5, 2)]:
+            for account_type in account_config['account_types']:
+                for exclude in [None, ['SAVINGS_BANK'], ['SAVINGS_BANK', 'LOANS', 'SALARY', 'INVALID']]:
+                    self.assertEqual(
+                        ledger.get_account_type_balance(account_type, exclude, as_of),
+                        sum([
+                            ledger.get_account_balance(account, as_of)
+                            for account, config in account_config['accounts'].items()
+                            if config['type'] == account_type and account not in (exclude or [])
+                        ])
+                    )
+        self.assertEqual(ledger.get_account_type_balance('ASSET', as_of=datetime(2022, 5, 2)), 20000)
+        self.assertEqual(ledger.get_account_type_balance('EXPENSE', as_of=datetime(2022, 5, 2)), 0)
+        self.assertEqual(ledger.get_account_type_balance('UNKNOWN'), 0)
+        self.assertEqual(ledger.type_ledgers['ASSET'].get_balance(), 17000)
+        accountant.enter_journal('SAVINGS_BANK', 'LOANS', 2000, datetime(2022, 5, 4), 'Payback')
+        accountant.enter_journal('CAR_EMI', 'SAVINGS_BANK', 3000, datetime(2022, 5, 5), 'EMI 4/48')
+        for as_of in [datetime(2022, 5, 2), datetime(2022, 5, 4), datetime(2022, 5, 5)]:
+            self.assertEqual(
+                ledger.get_account_type_balance('ASSET', ['LOANS'], as_of),
+                ledger.get_account_balance('SAVINGS_BANK', as_of) + ledger.get_account_balance('MUTUAL_FUNDS', as_of)
+            )
+
+        ledger = Ledger(Journal(), account_config, '2')
+        ledger.add_entry('SAVINGS_BANK', 'SALARY', 0.3, datetime(2022, 4, 30), 'Salary')
+        ledger.add_entry('MUTUAL_FUNDS', 'SAVINGS_BANK', 0.1, datetime(2022, 5, 1), 'ELSS')
+        ledger.add_entry('MUTUAL_FUNDS', 'SAVINGS_BANK', 0.1, datetime(2022, 5, 2), 'ELSS')
+        self.assertAlmostEqual(ledger.get_account_type_balance('ASSET', ['SAVINGS_BANK', 'MUTUAL_FUNDS']), 0)
+        self.assertAlmostEqual(
+            ledger.get_account_type_balance('ASSET', ['MUTUAL_FUNDS']), ledger.get_account_balance('SAVINGS_BANK')
+        )
+
+    def test_check_trial_balance(self):
+        ledger = Ledger(Journal(), account_config, 'loan')
+        self.assertTrue(ledger.check_trial_balance())
+        for i in range(1, 10):
+            ledger.add_entry('LOANS', 'SAVINGS_BANK', 100.1 * i, datetime(2022, 5, i), f'Lend {i}')
+            ledger.add_entry('SAVINGS_BANK', 'LOANS_PAYBACK', 30.7 * i, datetime(2022, 5, i), f'Back {i}')
+            self.assertTrue(ledger.check_trial_balance())
+        self.assertAlmostEqual(ledger.total_dr, 130.8 * 45)
+        ledger.insert_entry('CAR_EMI', 'SAVINGS_BANK', 10, datetime(2022, 5, 3), 'EMI')
+        self.assertTrue(ledger.check_trial_balance())
+
+        ledger.add_journal_entry(JournalEntry(40, 'CAR_EMI', 10, 0, datetime(2022, 5, 10), 'EMI', 'loan', None))
+        with self.assertRaises(UnbalancedLedger) as e:
+            ledger.check_trial_balance()
+        self.assertIn('total dr and total cr differ', str(e.exception))
+        ledger.add_journal_entry(JournalEntry(41, 'SAVINGS_BANK', 0, 10, datetime(2022, 5, 10), 'EMI', 'loan', None))
+        self.assertTrue(ledger.check_trial_balance())
+
+        accountant = Accountant(Journal(), {**account_config, 'minor_units': 100}, 'loan', compact_ledger=True)
+        for i in range(1, 10):
+            accountant.enter_journal('LOANS', 'SAVINGS_BANK', 0.1 * i, datetime(2022, 5, i), f'Lend {i}')
+        self.assertTrue(accountant.ledger.check_trial_balance())
+        self.assertEqual(accountant.ledger.total_cr, 450)
+
+    def test_check_trial_balance_large_totals(self):
+        # The totals run into billions, where their rounding errors exceed an absolute tolerance
+        ledger = Ledger(Journal(), account_config, 'loan')
+        for i in range(1, 500):
+            ledger.add_entry('LOANS', 'SAVINGS_BANK', 49937.57 * i, datetime(2022, 5, 1), f'Lend {i}')
+            ledger.add_entry('SAVINGS_BANK', 'LOANS_PAYBACK', 0.37 * i, datetime(2022, 5, 1), f'Back {i}')
+            ledger.add_entry('CAR_EMI', 'SALARY', 12345.67, datetime(2022, 5, 1), f'EMI {i}')
+        self.assertNotEqual(ledger.total_dr, sum([account.get_dr() for account in ledger.ledgers.values()]))
+        self.assertTrue(ledger.check_trial_balance())
+        ledger.add_journal_entry(JournalEntry(1497, 'CAR_EMI', 0.01, 0, datetime(2022, 5, 2), 'EMI', 'loan', None))
+        self.assertRaises(UnbalancedLedger, ledger.check_trial_balance)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.journal import Journal
+from pyluca.portfolio import PortfolioLedger
+from pyluca.tests.test_aging import account_config
+
+
+def _accountant(key: str, idx: int, config: dict = account_config) -> Accountant:
+    accountant = Accountant(Journal(), config, key)
+    accountant.enter_journal('SAVINGS_BANK', 'SALARY', 1000 * idx, datetime(2022, 4, 30), 'Salary')
+    for day in range(1, idx + 1):
+        accountant.enter_journal('LOANS', 'SAVINGS_BANK', 10.25 * day, datetime(2022, 5, day), f'Lend {day}')
+    accountant.enter_journal('SAVINGS_BANK', 'LOANS', 5.5 * idx, datetime(2022, 5, 20), 'Payback')
+    return accountant
+
+
+def _expected(accountants: dict, as_of: datetime = None, keys: list = None) -> dict:
+    balances = {account: 0 for account in account_config['accounts']}
+    for key, accountant in accountants.items():
+        if keys is None or key in keys:
+            for account, balance in accountant.ledger.get_balances(as_of).items():
+                balances[account] += balance
+    return balances
+
+
+class TestPortfolioLedger(TestCase):
+    def test_portfolio_ledger(self):
+        accountants = {f'loan-{idx}': _accountant(f'loan-{idx}', idx) for idx in range(1, 8)}
+        portfolio = PortfolioLedger(account_config, capacity=4)
+        for key, accountant in accountants.items():
+            if key == 'loan-1':
+                portfolio.add_entries(key, accountant.journal.entries)
+                continue
+            portfolio.add_ledger(accountant.ledger)
+        self.assertEqual(len(portfolio), sum([len(a.journal.entries) for a in accountants.values()]))
+
+        for as_of in [None, datetime(2022, 4, 1), datetime(2022, 5, 3), datetime(2022, 5, 20)]:
+            for keys in [None, ['loan-2', 'loan-5', 'unknown']]:
+                balances = portfolio.get_balances(as_of, keys)
+                for account, balance in _expected(accountants, as_of, keys).items():
+                    self.assertAlmostEqual(balances[account], balance)
+                    self.assertAlmostEqual(portfolio.get_account_balance(account, as_of, keys), balance)
+        self.assertAlmostEqual(
+            portfolio.get_account_type_balance('ASSET', exclude_accounts=['SAVINGS_BANK']),
+            sum([a.ledger.get_account_type_balance('ASSET', ['SAVINGS_BANK']) for a in accountants.values()])
+        )
+        key_balances = portfolio.get_key_balances('LOANS', datetime(2022, 5, 2), ['loan-1', 'loan-3'])
+        self.assertEqual(key_balances.to_dict(), {'loan-1': 10.25, 'loan-3': 30.75})
+
+        for key in ['loan-7', 'loan-6', 'loan-5', 'loan-4']:
+            portfolio.remove_key(key)
+            del accountants[key]
+        self.assertNotIn('loan-7', portfolio)
+        self.assertEqual(portfolio.get_keys(), ['loan-1', 'loan-2', 'loan-3'])
+        self.assertEqual(len(portfolio), sum([len(a.journal.entries) for a in accountants.values()]))
+        for account, balance in _expected(accountants).items():
+            self.assertAlmostEqual(portfolio.get_balances()[account], balance)
+        self.assertRaises(KeyError, lambda: portfolio.remove_key('loan-7'))
+
+        portfolio.remove_key('loan-2')
+        accountants['loan-2'] = _accountant('loan-2', 4)
+        portfolio.add_ledger(accountants['loan-2'].ledger)
+        self.assertEqual(sorted(portfolio.get_keys()), ['loan-1', 'loan-2', 'loan-3'])
+        for account, balance in _expected(accountants).items():
+            self.assertAlmostEqual(portfolio.get_balances()[account], balance)
+        self.assertEqual(portfolio.get_key_balances('SALARY').to_dict(), {'loan-1': 1000, 'loan-3': 3000, 'loan-2': 4000})
+
+    def test_many_keys(self):
+        portfolio = PortfolioLedger(account_config, capacity=4)
+        accountants = {f'loan-{idx}': _accountant(f'loan-{idx}', idx % 3 + 1) for idx in range(100)}
+        for accountant in accountants.values():
+            portfolio.add_ledger(accountant.ledger)
+        for idx in range(0, 100, 3):
+            portfolio.remove_key(f'loan-{idx}')
+            del accountants[f'loan-{idx}']
+        accountants['loan-0'] = _accountant('loan-0', 2)
+        portfolio.add_ledger(accountants['loan-0'].ledger)
+        self.assertEqual(len(portfolio.get_keys()), len(accountants))
+        self.assertEqual(len(portfolio), sum([len(a.journal.entries) for a in accountants.values()]))
+        for account, balance in _expected(accountants).items():
+            self.assertAlmostEqual(portfolio.get_balances()[account], balance)
+        self.assertEqual(portfolio.get_key_balances('SALARY')['loan-0'], 2000)
+        for idx in range(1, 100, 3):
+            portfolio.remove_key(f'loan-{idx}')
+            del accountants[f'loan-{idx}']
+        self.assertEqual(len(portfolio), sum([len(a.journal.entries) for a in accountants.values()]))
+        self.assertEqual(portfolio.get_key_balances('SALARY').to_dict(), {
+            key: accountant.ledger.get_account_balance('SALARY') for key, accountant in accountants.items()
+        })
+
+    def test_minor_units(self):
+        config = {**account_config, 'minor_units': 100}
+        portfolio = PortfolioLedger(config)
+        for idx in range(1, 4):
+            portfolio.add_ledger(_accountant(f'loan-{idx}', idx, config).ledger)
+        self.assertEqual(portfolio.get_account_balance('LOANS'), 10.25 * 6 + 10.25 * 3 + 10.25 - 5.5 * 6)
+        self.assertEqual(portfolio.get_balances()['SALARY'], 6000)
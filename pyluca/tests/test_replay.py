@@ -0,0 +1,55 @@
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant
+from pyluca.action import apply
+from pyluca.journal import Journal
+from pyluca.replay import replay
+from pyluca.tests.test_action import personal_fin_config, SalaryEvent, InvestMFEvent, MFProfitEvent
+
+replay_config = {
+    **personal_fin_config,
+    'actions_config': {
+        'on_event': {
+            'SalaryEvent': {
+                'actions': [
+                    {
+                        'dr_account': 'SAVINGS_BANK',
+                        'cr_account': 'SALARY',
+                        'amount': 'amount',
+                        'narration': 'Salary'
+                    }
+                ]
+            },
+            'InvestMFEvent': personal_fin_config['actions_config']['on_event']['InvestMFEvent'],
+            'MFProfitEvent': personal_fin_config['actions_config']['on_event']['MFProfitEvent']
+        }
+    }
+}
+
+
+def _events(key: int):
+    return [
+        SalaryEvent(f'{key}-1', 1000 * key, datetime(2022, 4, 21), datetime(2022, 4, 21)),
+        InvestMFEvent(f'{key}-2', 500 * key, datetime(2022, 4, 22), datetime(2022, 4, 22)),
+        MFProfitEvent(f'{key}-3', datetime(2022, 4, 30), datetime(2022, 4, 30))
+    ]
+
+
+class TestReplay(TestCase):
+    def test_replay(self):
+        groups = [(str(key), _events(key)) for key in range(1, 8)]
+        results = list(replay(iter(groups), replay_config, {'multiplier': .1}, max_workers=2, chunk_size=3))
+        self.assertEqual([r.key for r in results], [key for key, _ in groups])
+        for (key, events), result in zip(groups, results):
+            accountant = Accountant(Journal(), replay_config, key)
+            for e in events:
+                apply(e, accountant, {'multiplier': .1})
+            self.assertEqual(
+                [je.__dict__ for je in accountant.journal.entries],
+                [je.__dict__ for je in result.journal.entries]
+            )
+            self.assertEqual(accountant.ledger.get_balances(), result.balances)
+
+        results = list(replay(groups[:2], replay_config, {'multiplier': .1}, max_workers=1, with_journal=False))
+        self.assertIsNone(results[0].journal)
+        self.assertEqual(results[1].balances['MUTUAL_FUNDS'], 1100)
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from pyluca.accountant import Accountant, Posting
+from pyluca.aging import get_accounts_aging
+from pyluca.journal import Journal, JournalEntry, InvalidEntryException
+from pyluca.sqlite_journal import SQLiteJournal, connect, disconnect
+from pyluca.tests.test_aging import account_config
+from pyluca.tests.test_columnar_journal import _pass_entries
+
+
+class TestSQLiteJournal(TestCase):
+    def test_sqlite_journal(self):
+        accountant = Accountant(Journal(), account_config, 'person1')
+        _pass_entries(accountant)
+        with tempfile.TemporaryDirectory() as path:
+            file_path = os.path.join(path, 'books.db')
+            with SQLiteJournal(file_path, 'person1', batch_size=5) as journal:
+                _pass_entries(Accountant(journal, account_config, 'person1'))
+                self.assertEqual(connect(file_path).execute('SELECT COUNT(*) FROM journal_entries').fetchone(), (20,))
+            with SQLiteJournal(file_path, 'person2') as journal:
+                other = Accountant(journal, account_config, 'person2')
+                other.enter_journals([
+                    Posting('SAVINGS_BANK', 'SALARY', 1000, datetime(2022, 1, 1), 'Salary', 'e1')
+                ])
+
+            journal = SQLiteJournal(file_path, 'person1')
+            self.assertIs(journal.connection, connect(file_path))
+            self.assertEqual(journal.max_date, datetime(2022, 5, 20))
+            self.assertEqual([je.__dict__ for je in accountant.journal.entries], [je.__dict__ for je in journal.entries])
+            self.assertEqual(
+                Accountant(journal, account_config, 'person1').ledger.get_balances(),
+                accountant.ledger.get_balances()
+            )
+            self.assertRaises(InvalidEntryException, lambda: journal.add_entry(
+                JournalEntry(22, 'LOANS', 10, 0, datetime(2022, 5, 19), 'Backdated', 'person1', None)
+            ))
+
+            journal = SQLiteJournal(file_path, 'person1', start=datetime(2022, 5, 2), end=datetime(2022, 5, 4))
+            self.assertEqual([je.sl_no for je in journal.entries], list(range(9)))
+            self.assertEqual(
+                [(je.account, je.dr_amount, je.cr_amount, je.date) for je in journal.entries[:3]],
+                [
+                    ('SALARY', 0, 20000, datetime(2022, 4, 30)),
+                    ('LOANS', 1000, 0, datetime(2022, 5, 1)),
+                    ('SAVINGS_BANK', 20000, 1000, datetime(2022, 5, 1))
+                ]
+            )
+            self.assertEqual(journal.max_date, datetime(2022, 5, 20))
+
+            journal = SQLiteJournal(file_path, 'person1', start=datetime(2022, 5, 5))
+            ranged = Accountant(journal, account_config, 'person1')
+            self.assertEqual(ranged.ledger.get_balances(), accountant.ledger.get_balances())
+            previous_aging = get_accounts_aging(account_config, journal.entries, ['LOANS'], datetime(2022, 5, 30))
+            ranged.enter_journal('SAVINGS_BANK', 'LOANS', 500, datetime(2022, 5, 21), 'Payback', 'e2')
+            accountant.enter_journal('SAVINGS_BANK', 'LOANS', 500, datetime(2022, 5, 21), 'Payback', 'e2')
+            self.assertEqual(ranged.ledger.get_balances(), accountant.ledger.get_balances())
+            self.assertEqual([je.sl_no for je in journal.entries], list(range(len(journal.entries))))
+            aging = get_accounts_aging(
+                account_config, journal.entries, ['LOANS'], datetime(2022, 5, 30), previous_aging
+            )
+            full_aging = get_accounts_aging(account_config, journal.entries, ['LOANS'], datetime(2022, 5, 30))
+            self.assertEqual(
+                [(age.date, age.counter.get_balance()) for age in aging['LOANS'].ages],
+                [(age.date, age.counter.get_balance()) for age in full_aging['LOANS'].ages]
+            )
+            self.assertEqual(aging['LOANS'].last_sl_no, full_aging['LOANS'].last_sl_no)
+            journal.flush()
+            self.assertEqual(
+                connect(file_path).execute(
+                    'SELECT sl_no FROM journal_entries WHERE key = ? ORDER BY id', ('person1',)
+                ).fetchall(),
+                [(sl_no,) for sl_no in range(24)]
+            )
+
+            self.assertRaises(ValueError, lambda: SQLiteJournal(file_path, 'person1', allow_backdated=True))
+
+            connection = sqlite3.connect(file_path)
+            journal = SQLiteJournal(connection, 'person2')
+            self.assertEqual(
+                [(je.account, je.dr_amount, je.cr_amount, je.event_id) for je in journal.entries],
+                [('SAVINGS_BANK', 1000, 0, 'e1'), ('SALARY', 0, 1000, 'e1')]
+            )
+            connection.close()
+            disconnect(file_path)